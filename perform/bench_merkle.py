@@ -0,0 +1,50 @@
+'''
+@File     : bench_merkle.py
+@Time     : 2025/01/07 09:12:40
+@Author   : H.SEON
+@Contact  : dsj34473@163.com
+'''
+
+import sys
+sys.path.append('.')
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from src.BlockChain.block import MerkleTree
+
+# 交易数
+TXID_COUNTS = (1000, 10000, 100000)
+# 重复次数
+REPEAT = 5
+
+class _TX(object):
+    def __init__(self, txid: bytes) -> None:
+        self.txid = txid
+
+def bench(name: str, func) -> float:
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        root = func()
+    elapsed = (time.perf_counter() - start) / REPEAT
+    print(f'{name:<24}{elapsed * 1000:>10.2f} ms')
+    return root
+
+if __name__ == '__main__':
+    for count in TXID_COUNTS:
+        txids = [os.urandom(32) for _ in range(count)]
+        print(f'txids: {count}')
+
+        def incremental():
+            merkle_tree = MerkleTree.__new__(MerkleTree)
+            merkle_tree.txns, merkle_tree.txids, merkle_tree.levels = [], set(), [[]]
+            for txid in txids:
+                merkle_tree.update(_TX(txid))
+            return merkle_tree.root_digest()
+
+        roots = [
+            bench('update', incremental),
+            bench('root_of', lambda: MerkleTree.root_of(txids)),
+        ]
+        with ThreadPoolExecutor(os.cpu_count()) as executor:
+            roots.append(bench('root_of (threads)', lambda: MerkleTree.root_of(txids, executor)))
+        assert len(set(roots)) == 1
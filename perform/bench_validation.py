@@ -0,0 +1,58 @@
+'''
+@File     : bench_validation.py
+@Time     : 2025/01/11 14:20:09
+@Author   : H.SEON
+@Contact  : dsj34473@163.com
+'''
+
+import sys
+sys.path.append('.')
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from src.BlockChain.block import BLOCK, BlockHeader, MerkleTree
+from src.BlockChain.validation import BlockValidator
+from src.Transaction.transaction import TRANSACTION, TxIn, TxOut, outpoint, AuditMission
+
+# 合成区块的交易数（需满足 MAX_BLOCK_SIZE）
+TXN_COUNT = 10000
+# 重复次数
+REPEAT = 3
+# 工作进程数
+WORKERS = max(os.cpu_count() or 1, 2)
+
+def synthetic_block(count: int) -> BLOCK:
+    txns = [AuditMission(height=1, ATM_script=b'\x00')] + [
+        TRANSACTION(
+            tx_in=[TxIn(outpoint(os.urandom(32).hex(), 0), os.urandom(8))],
+            tx_out=[TxOut(1000, os.urandom(8))],
+            lock_time=0
+        ) for _ in range(count)
+    ]
+    return BLOCK(
+        BlockHeader(
+            previous_block_header_hash='00' * 32,
+            merkle_root_hash=MerkleTree.root_of([txn.txid for txn in txns]).hex(),
+            time=int(time.time())
+        ),
+        txns
+    )
+
+def bench(name: str, validator: BlockValidator, block: BLOCK) -> None:
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        validator.check_block(block)
+    print(f'{name:<24}{(time.perf_counter() - start) / REPEAT * 1000:>10.2f} ms')
+
+if __name__ == '__main__':
+    block = synthetic_block(TXN_COUNT)
+    # 模拟从网络接收：交易保留线上字节
+    block, _ = BLOCK.unpack_from(block.serialize())
+    print(f'txns: {TXN_COUNT}, size: {len(block)} bytes')
+    with BlockValidator(None, workers=1) as validator:
+        bench('serial', validator, block)
+    with ThreadPoolExecutor(os.cpu_count()) as executor, BlockValidator(None, executor=executor) as validator:
+        bench('threads', validator, block)
+    with ProcessPoolExecutor(WORKERS) as executor, BlockValidator(None, executor=executor) as validator:
+        validator.check_block(block)
+        bench(f'processes ({WORKERS})', validator, block)
@@ -0,0 +1,63 @@
+'''
+@File     : Global.py
+@Time     : 2025/01/05 14:21:37
+@Author   : H.SEON
+@Contact  : dsj34473@163.com
+'''
+
+import sys
+sys.path.append('.')
+import os
+from src.utils.data import SERIALIZE
+
+'''
+区块存储
+'''
+# 区块文件魔数
+BLOCK_FILE_MAGIC = b'\xfa\xbf\xb5\xda'
+# 区块文件名
+BLOCK_FILE_NAME = 'blk{:05d}.dat'
+# 索引文件名
+INDEX_FILE_NAME = 'index.dat'
+# 单个区块文件的最大字节数
+MAX_BLOCK_FILE_SIZE = 128 * 1024 * 1024
+
+# 区块记录头序列化格式：魔数 + 区块长度
+BLOCK_RECORD_SERIALIZE = SERIALIZE('<4sI')
+# 索引记录序列化格式：区块头哈希 + 高度 + 文件号 + 偏移 + 长度
+INDEX_RECORD_SERIALIZE = SERIALIZE('<32sIIQI')
+
+'''
+区块头链
+'''
+# 单次 getheaders 返回的最大区块头数
+MAX_HEADERS_RESULTS = 2000
+# 区块定位器中逐个列出的最近区块数，此后步长按倍数增长
+LOCATOR_DENSE_COUNT = 10
+
+'''
+默克尔树
+'''
+# 批量计算默克尔根时，每个线程任务合并的哈希对数
+MERKLE_CHUNK_SIZE = 4096
+
+'''
+未花费输出集合
+'''
+# 未花费输出数据库文件名
+UTXO_FILE_NAME = 'utxo.db'
+# 撤销日志文件名
+UNDO_FILE_NAME = 'undo.dat'
+# 撤销记录头序列化格式：区块头哈希 + 高度 + 长度
+UNDO_RECORD_SERIALIZE = SERIALIZE('<32sII')
+# 内存中缓存的未花费输出条目数
+UTXO_CACHE_SIZE = 100000
+
+'''
+区块验证
+'''
+# 上下文无关检查的工作线程数，不大于 1 时在当前线程中检查
+# 默认顺序检查：进程池的序列化开销高于检查本身，且客户端运行在线程中，不宜派生进程
+VALIDATION_WORKERS = 1
+# 每个工作任务检查的交易数，交易数不超过该值的区块直接在当前进程中检查
+VALIDATION_CHUNK_SIZE = 1000
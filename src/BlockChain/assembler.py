@@ -0,0 +1,74 @@
+'''
+@File     : assembler.py
+@Time     : 2025/01/10 10:15:03
+@Author   : H.SEON
+@Contact  : dsj34473@163.com
+'''
+
+import sys
+sys.path.append('.')
+from time import time
+from src.BlockChain.block import BLOCK, BlockHeader, MerkleTree
+from src.Transaction.transaction import TRANSACTION, AuditMission
+from src.Transaction.mempool import MemoryPool
+from src.V.v1.CONFIG import *
+
+# 交易数 compactSize 的最大长度，组装时预留
+TXN_COUNT_RESERVED = 9
+
+# 区块组装
+# ATM 交易在首位，其后按费率从高到低从交易池取交易（父交易须已在区块中），
+# 用交易缓存的长度累计区块大小，默克尔根随交易追加增量更新
+class BlockAssembler(object):
+    def __init__(self,
+        mempool: MemoryPool,
+        max_block_size: int = MAX_BLOCK_SIZE
+    ) -> None:
+        self.mempool = mempool
+        self.max_block_size = max_block_size
+
+    # 按费率从高到低、同费率先到先出的候选交易
+    def candidates(self) -> list[TRANSACTION]:
+        txns = self.mempool.txns
+        order = sorted((-fee / len(txns[txid]), sequence, txid) for txid, (_, fee, sequence) in self.mempool.entries.items())
+        return [txns[txid] for _, _, txid in order]
+
+    def assemble(self,
+        previous_block_header_hash: bytes | str | None,
+        height: int,
+        ATM_script: bytes,
+        block_time: int | None = None
+    ) -> BLOCK:
+        merkle_tree = MerkleTree([AuditMission(height=height, ATM_script=ATM_script)])
+        size = len(BLOCK_HEADER_SERIALIZE) + TXN_COUNT_RESERVED + len(merkle_tree.txns[0])
+        # 父交易 -> 等待其入块的子交易
+        waiting: dict[bytes, list[TRANSACTION]] = {}
+        for candidate in self.candidates():
+            stack = [candidate]
+            while stack:
+                tx = stack.pop()
+                if tx.txid in merkle_tree.txids or len(tx) + size > self.max_block_size:
+                    continue
+                parent = next((
+                    parent for parent in (bytes.fromhex(tx_in.previous_output.hash) for tx_in in tx.tx_in)
+                    if parent in self.mempool.txns and parent not in merkle_tree.txids
+                ), None)
+                if parent is not None:
+                    waiting.setdefault(parent, []).append(tx)
+                    continue
+                merkle_tree.update(tx)
+                size += len(tx)
+                stack.extend(waiting.pop(tx.txid, []))
+
+        if previous_block_header_hash is None:
+            previous_block_header_hash = '00' * len(HASH_SERIALIZE)
+        elif isinstance(previous_block_header_hash, bytes):
+            previous_block_header_hash = previous_block_header_hash.hex()
+        return BLOCK(
+            block_header=BlockHeader(
+                previous_block_header_hash=previous_block_header_hash,
+                merkle_root_hash=merkle_tree.root(),
+                time=int(time()) if block_time is None else block_time
+            ),
+            txns=merkle_tree.txns
+        )
@@ -9,10 +9,12 @@ import sys
 sys.path.append('.')
 
 import hashlib
-from typing import List
+from typing import List, Iterable
+from concurrent.futures import Executor
 from src.utils.data import compactSize
 from src.Transaction.transaction import TRANSACTION, AuditMission
 from src.V.v1.CONFIG import *
+from src.BlockChain.CONF.Global import *
 
 # 定义区块类
 class BLOCK(object):
@@ -27,33 +29,47 @@ class BLOCK(object):
             raise ValueError('Invalid block_header')
 
     def serialize(self) -> bytes:
-        return self.block_header.serialize() \
-        + self.txn_count.serialize() \
-        + b''.join([txn.serialize() for txn in self.txns])
+        return b''.join(self.buffers())
+
+    # 区块各段的缓冲区列表，交易直接使用其原始线上字节，不拼接成整块
+    def buffers(self) -> list[bytes | memoryview]:
+        return [
+            self.block_header.serialize(),
+            self.txn_count.serialize(),
+            *[txn.raw() for txn in self.txns]
+        ]
+
+    # 将序列化结果逐段追加到调用方提供的缓冲区，返回写入的字节数
+    def serialize_into(self, buffer: bytearray) -> int:
+        start = len(buffer)
+        for data in self.buffers():
+            buffer += data
+        return len(buffer) - start
 
     @staticmethod
     def deserialize(data: bytes) -> 'BLOCK':
-        block_header, data = BlockHeader.deserialize(data)
-        txn_count, data = compactSize.deserialize(data)
+        data = memoryview(data)
+        block, offset = BLOCK.unpack_from(data)
+        return block if offset == len(data) else (block, data[offset:])
+
+    # 单次线性扫描解码，返回区块与新的偏移（从 0 开始即为消耗的字节数）
+    @staticmethod
+    def unpack_from(data: bytes | memoryview, offset: int = 0) -> tuple['BLOCK', int]:
+        block_header, offset = BlockHeader.unpack_from(data, offset)
+        txn_count, offset = compactSize.unpack_from(data, offset)
         txns = []
-        for _ in range(txn_count - 1):
-            txn, data = TRANSACTION.deserialize(data)
+        for _ in range(txn_count):
+            txn, offset = (
+                AuditMission if not txns and AuditMission.match(data, offset) else TRANSACTION
+            ).unpack_from(data, offset)
             txns.append(txn)
-        else:
-            _last = TRANSACTION.deserialize(data)
-        
         return BLOCK(
             block_header=block_header,
-            txns=txns + [_last]
-        ) if isinstance(_last, TRANSACTION) else (
-            BLOCK(
-                block_header=block_header,
-                txns=txns + [_last[0]]
-            ), _last[-1]
-        )
+            txns=txns
+        ), offset
     
     def __len__(self) -> int:
-        return len(self.serialize())
+        return sum(len(data) for data in self.buffers())
     
     def __str__(self) -> str:
         string_block_header = str(self.block_header).replace('\n', '\n\t')
@@ -92,20 +108,20 @@ class BlockHeader(object):
     # 反序列化区块头
     @staticmethod
     def deserialize(data: bytes) -> 'BlockHeader':
-        version, previous_block_header_hash, merkle_root_hash, time, data = BLOCK_HEADER_SERIALIZE.deserialize(data)
+        data = memoryview(data)
+        block_header, offset = BlockHeader.unpack_from(data)
+        return block_header if offset == len(data) else (block_header, data[offset:])
+
+    # 从偏移处解码，返回区块头与新的偏移
+    @staticmethod
+    def unpack_from(data: bytes | memoryview, offset: int = 0) -> tuple['BlockHeader', int]:
+        version, previous_block_header_hash, merkle_root_hash, time, offset = BLOCK_HEADER_SERIALIZE.unpack_from(data, offset)
         return BlockHeader(
             version=version,
             previous_block_header_hash=previous_block_header_hash.hex(),
             merkle_root_hash=merkle_root_hash.hex(),
             time=time
-        ) if not data else (
-            BlockHeader(
-                version=version,
-                previous_block_header_hash=previous_block_header_hash.hex(),
-                merkle_root_hash=merkle_root_hash.hex(),
-                time=time
-            ), data
-        )
+        ), offset
 
     def __len__(self) -> int:
         return len(self.serialize())
@@ -115,45 +131,206 @@ class BlockHeader(object):
 
 # 定义默克尔树类
 class MerkleTree(object):
+    # 默克尔树累加器
+    # levels[0] 为交易哈希，levels[k] 只保存由两个完整子节点得到的第 k 层节点，
+    # 右侧未配对的部分在计算根时按奇数复制末尾的规则折叠，追加为摊还 O(1)，求根为 O(log n)
     def __init__(self,
         txns: List[TRANSACTION],
     ) -> None:
         if len(txns) < 1 or not isinstance(txns[0], AuditMission):
             raise ValueError('Invalid txns')
-        self.txns = [txns[0]]
-        self.merkle_tree = [[1, self.txns[0]._hash(), self.txns[0]._hash()]]
-        for txn in txns[1:]:
+        self.txns: List[TRANSACTION] = []
+        self.txids: set[bytes] = set()
+        self.levels: List[List[bytes]] = [[]]
+        for txn in txns:
             self.update(txn)
 
     def update(self, tx: TRANSACTION) -> None:
-        txid = tx._hash()
-        
-        if txid in self.merkle_tree[0]:
+        txid = tx.txid
+        if txid in self.txids:
             return
         self.txns.append(tx)
+        self.txids.add(txid)
+
+        node, depth = txid, 0
+        while True:
+            level = self.levels[depth]
+            level.append(node)
+            if len(level) % 2:
+                break
+            node, depth = self.pair_hash(level[-2], node), depth + 1
+            if depth == len(self.levels):
+                self.levels.append([])
+
+    def root_digest(self) -> bytes:
+        carry = None
+        for level in self.levels:
+            if len(level) + (carry is not None) == 1:
+                return carry or level[0]
+            if len(level) % 2:
+                carry = self.pair_hash(level[-1], carry or level[-1])
+            elif carry is not None:
+                carry = self.pair_hash(carry, carry)
+        return carry
 
-        for _ in self.merkle_tree:
-            if _[0] % 2 == 0:
-                _ += [txid, txid]
-            else:
-                _[-1] = txid
-            txid = self.pair_hash(*_[-2:])
-            _[0] += 1
-        else:
-            self.merkle_tree.append([1, txid, txid])
-        
     def root(self) -> str:
-        return self.merkle_tree[-1][1]
+        return self.root_digest().hex()
 
     @staticmethod
-    def pair_hash(a: str, b: str) -> str:
-        return hashlib.sha256(
-                bytes.fromhex(a) + bytes.fromhex(b)
-        ).hexdigest()
+    def pair_hash(a: bytes, b: bytes) -> bytes:
+        return hashlib.sha256(a + b).digest()
+
+    # 批量计算默克尔根
+    # 所有交易哈希连续存放在一个 bytearray 中，逐层将相邻两个哈希就地合并，奇数时复制末尾；
+    # 给定 executor 且该层足够大时，按块分发到线程池，整层计算完成后再写回
+    @staticmethod
+    def root_of(
+        txids: List[bytes],
+        executor: Executor | None = None,
+        chunk_size: int = MERKLE_CHUNK_SIZE
+    ) -> bytes:
+        if not txids:
+            raise ValueError('Invalid txids')
+        size = len(HASH_SERIALIZE)
+        count = len(txids)
+        digests = bytearray((count + 1) * size)
+        digests[:count * size] = b''.join(txids)
+        view = memoryview(digests)
+        while count > 1:
+            if count % 2:
+                view[count * size:(count + 1) * size] = view[(count - 1) * size:count * size]
+                count += 1
+            count //= 2
+            if executor is None or count <= chunk_size:
+                for i in range(count):
+                    view[i * size:(i + 1) * size] = hashlib.sha256(view[2 * i * size:2 * (i + 1) * size]).digest()
+            else:
+                chunks = executor.map(
+                    MerkleTree._pair_hashes,
+                    [view[2 * i * size:2 * min(i + chunk_size, count) * size] for i in range(0, count, chunk_size)]
+                )
+                view[:count * size] = b''.join(chunks)
+        root = bytes(view[:size])
+        view.release()
+        return root
+
+    @staticmethod
+    def _pair_hashes(data: memoryview) -> bytes:
+        size = 2 * len(HASH_SERIALIZE)
+        return b''.join(hashlib.sha256(data[i:i + size]).digest() for i in range(0, len(data), size))
+
+    def __contains__(self, txid: bytes) -> bool:
+        return txid in self.txids
 
     def __len__(self) -> int:
         return len(self.txns)
 
+# 部分默克尔树
+# 按深度优先遍历记录标志位：1 表示该节点为匹配交易或其祖先，0 表示其子树被裁剪、只给出该节点哈希
+class PartialMerkleTree(object):
+    def __init__(self,
+        transaction_count: int,
+        hashes: List[bytes],
+        flags: Iterable[bool]
+    ) -> None:
+        self.transaction_count = transaction_count
+        self.hashes = hashes
+        self.flags = flags
+
+    # 第 height 层的节点数（叶子层为 0）
+    def width(self, height: int) -> int:
+        return (self.transaction_count + (1 << height) - 1) >> height
+
+    def tree_height(self) -> int:
+        height = 0
+        while self.width(height) > 1:
+            height += 1
+        return height
+
+    # 由区块全部交易哈希与待证明的交易哈希生成最少的哈希与标志位
+    @staticmethod
+    def build(txids: List[bytes], matches: set[bytes]) -> 'PartialMerkleTree':
+        if not txids:
+            raise ValueError('Invalid txids')
+        partial = PartialMerkleTree(len(txids), [], [])
+        levels, matched = [list(txids)], [[txid in matches for txid in txids]]
+        while len(levels[-1]) > 1:
+            level, match = levels[-1], matched[-1]
+            levels.append([
+                MerkleTree.pair_hash(level[i], level[min(i + 1, len(level) - 1)]) for i in range(0, len(level), 2)
+            ])
+            matched.append([any(match[i:i + 2]) for i in range(0, len(match), 2)])
+
+        def traverse(height: int, position: int) -> None:
+            parent_of_match = matched[height][position]
+            partial.flags.append(parent_of_match)
+            if height == 0 or not parent_of_match:
+                partial.hashes.append(levels[height][position])
+                return
+            traverse(height - 1, position * 2)
+            if position * 2 + 1 < partial.width(height - 1):
+                traverse(height - 1, position * 2 + 1)
+
+        traverse(len(levels) - 1, 0)
+        return partial
+
+    # 由哈希与标志位重算默克尔根，返回 (默克尔根, 匹配的交易哈希)
+    def extract(self) -> tuple[bytes, List[bytes]]:
+        if not self.transaction_count or len(self.hashes) > self.transaction_count:
+            raise ValueError('Invalid partial merkle tree')
+        flags, hashes, matches = iter(self.flags), iter(self.hashes), []
+
+        def traverse(height: int, position: int) -> bytes:
+            parent_of_match = next(flags, None)
+            if parent_of_match is None:
+                raise ValueError('Flags are exhausted')
+            if height == 0 or not parent_of_match:
+                hash = next(hashes, None)
+                if hash is None:
+                    raise ValueError('Hashes are exhausted')
+                if height == 0 and parent_of_match:
+                    matches.append(bytes(hash))
+                return hash
+            left = traverse(height - 1, position * 2)
+            if position * 2 + 1 < self.width(height - 1):
+                right = traverse(height - 1, position * 2 + 1)
+                # 右子节点与左子节点相同时可构造出同根的不同交易集合
+                if right == left:
+                    raise ValueError('Duplicate merkle nodes')
+            else:
+                right = left
+            return MerkleTree.pair_hash(left, right)
+
+        root = traverse(self.tree_height(), 0)
+        if next(hashes, None) is not None or any(flags):
+            raise ValueError('Unused hashes or flags')
+        return root, matches
+
+# 默克尔区块
+# 区块头中的默克尔根随交易追加同步更新，可按交易哈希生成部分默克尔树
+class MerkleBlock(BLOCK):
+    def __init__(self,
+        block_header: 'BlockHeader',
+        txns: List[TRANSACTION]
+    ) -> None:
+        self.merkle_tree = MerkleTree(txns)
+        super().__init__(block_header, self.merkle_tree.txns)
+        self.block_header.merkle_root_hash = self.merkle_tree.root()
+
+    def update(self, tx: TRANSACTION) -> None:
+        self.merkle_tree.update(tx)
+        self.txn_count = compactSize(len(self.txns))
+        self.block_header.merkle_root_hash = self.merkle_tree.root()
+
+    def root(self) -> str:
+        return self.merkle_tree.root()
+
+    def partial(self, txids: set[bytes]) -> PartialMerkleTree:
+        return PartialMerkleTree.build(self.merkle_tree.levels[0], txids)
+
+    def __len__(self) -> int:
+        return len(self.merkle_tree)
+
 if __name__ == '__main__':
     # 模块测试代码
     pass
\ No newline at end of file
@@ -5,18 +5,171 @@
 @Contact  : dsj34473@163.com
 '''
 
-from hashlib import sha256
-from typing import List, Tuple
-
-# # 链结构
-# class BlockChain(object):
-#     def __init__(self) -> None:
-#         self.blocks = []
-#         self.blocks.append(Block.genesis())
-    
-#     def add_block(self, data: str) -> None:
-#         self.blocks.append(Block.mine_block(self.blocks[-1], data))
-    
-#     def __str__(self) -> str:
-#         return '\n'.join([str(block) for block in self.blocks])
+import sys
+sys.path.append('.')
+import os
+import mmap
+from src.BlockChain.block import BLOCK
+from src.BlockChain.CONF.Global import *
 
+# 链结构
+# 区块按 BLOCK.serialize 格式追加写入分段的区块文件，
+# 索引文件记录 区块头哈希/高度 -> (文件号, 偏移, 长度)，重启时只读取索引
+class BlockChain(object):
+    def __init__(self,
+        path: str,
+        max_file_size: int = MAX_BLOCK_FILE_SIZE
+    ) -> None:
+        self.path = path
+        self.max_file_size = max_file_size
+        # 高度 -> 区块头哈希
+        self.hashes: list[bytes] = []
+        # 区块头哈希 -> (高度, 文件号, 偏移, 长度)
+        self.index: dict[bytes, tuple[int, int, int, int]] = {}
+        # 区块文件的只读内存映射
+        self.maps: dict[int, mmap.mmap] = {}
+        os.makedirs(self.path, exist_ok=True)
+        self.load_index()
+        self.trim_files()
+
+    # 读取索引文件，忽略未写完整的末尾记录
+    def load_index(self) -> None:
+        index_path = os.path.join(self.path, INDEX_FILE_NAME)
+        if not os.path.exists(index_path):
+            return
+        with open(index_path, 'rb') as f:
+            data = f.read()
+        offset = 0
+        while offset + len(INDEX_RECORD_SERIALIZE) <= len(data):
+            hash, height, file_number, block_offset, length, offset = INDEX_RECORD_SERIALIZE.unpack_from(data, offset)
+            if height != len(self.hashes):
+                raise ValueError('Invalid index')
+            self.hashes.append(hash)
+            self.index[hash] = (height, file_number, block_offset, length)
+        # 截去写入中断留下的不完整记录，之后的追加才能对齐
+        if offset != len(data):
+            os.truncate(index_path, offset)
+
+    # 截去最后一条索引记录之后的区块数据并删除其后的区块文件，使追加位置与索引一致；
+    # 这些数据来自写入区块后、写入索引前的中断，或 pop_block 移除的区块
+    def trim_files(self) -> None:
+        if self.hashes:
+            _, self.file_number, offset, length = self.index[self.hashes[-1]]
+            self.file_size = offset + length
+        else:
+            self.file_number, self.file_size = 0, 0
+        file_number = self.file_number
+        while os.path.exists(file_path := os.path.join(self.path, BLOCK_FILE_NAME.format(file_number))):
+            if file_number == self.file_number:
+                if os.path.getsize(file_path) > self.file_size:
+                    self.unmap(file_number)
+                    os.truncate(file_path, self.file_size)
+            else:
+                self.unmap(file_number)
+                os.remove(file_path)
+            file_number += 1
+
+    def size_of(self, file_number: int) -> int:
+        file_path = os.path.join(self.path, BLOCK_FILE_NAME.format(file_number))
+        return os.path.getsize(file_path) if os.path.exists(file_path) else 0
+
+    # 追加区块，返回其高度
+    def add_block(self, block: BLOCK) -> int:
+        hash = bytes.fromhex(block.block_header._hash())
+        if hash in self.index:
+            return self.index[hash][0]
+        if self.hashes and bytes.fromhex(block.block_header.previous_block_header_hash) != self.hashes[-1]:
+            raise ValueError('Block does not extend the chain')
+        data = block.serialize()
+        record = BLOCK_RECORD_SERIALIZE.serialize(BLOCK_FILE_MAGIC, len(data))
+        if self.file_size and self.file_size + len(record) + len(data) > self.max_file_size:
+            self.file_number += 1
+            self.file_size = self.size_of(self.file_number)
+        with open(os.path.join(self.path, BLOCK_FILE_NAME.format(self.file_number)), 'ab') as f:
+            f.write(record)
+            f.write(data)
+        offset = self.file_size + len(record)
+        self.file_size = offset + len(data)
+        height = len(self.hashes)
+        with open(os.path.join(self.path, INDEX_FILE_NAME), 'ab') as f:
+            f.write(INDEX_RECORD_SERIALIZE.serialize(hash, height, self.file_number, offset, len(data)))
+        self.hashes.append(hash)
+        self.index[hash] = (height, self.file_number, offset, len(data))
+        return height
+
+    # 移除链顶区块并返回：先截断索引，再截去区块文件中该区块的数据
+    # 被移除区块的视图在截断后失效，调用方不应继续持有
+    def pop_block(self) -> BLOCK:
+        if not self.hashes:
+            raise ValueError('Blockchain is empty')
+        block = self.get_block(self.hashes[-1])
+        del self.index[self.hashes.pop()]
+        os.truncate(os.path.join(self.path, INDEX_FILE_NAME), len(self.hashes) * len(INDEX_RECORD_SERIALIZE))
+        self.trim_files()
+        return block
+
+    # 区块位置：(文件号, 偏移, 长度)，key 为区块头哈希或高度
+    def locate(self, key: bytes | str | int) -> tuple[int, int, int]:
+        if isinstance(key, int):
+            key = self.hashes[key]
+        elif isinstance(key, str):
+            key = bytes.fromhex(key)
+        if key not in self.index:
+            raise KeyError('Block not found')
+        _, file_number, offset, length = self.index[key]
+        return file_number, offset, length
+
+    # 区块序列化数据的只读视图，直接指向区块文件的内存映射，不复制数据
+    # 历史区块由页缓存提供，视图可直接交给网络层发送
+    def view_block(self, key: bytes | str | int) -> memoryview:
+        file_number, offset, length = self.locate(key)
+        return memoryview(self.map(file_number, offset + length))[offset:offset + length]
+
+    # 映射区块文件；正在追加的文件在超出已映射范围时重新映射
+    def map(self, file_number: int, size: int) -> mmap.mmap:
+        if file_number not in self.maps or len(self.maps[file_number]) < size:
+            with open(os.path.join(self.path, BLOCK_FILE_NAME.format(file_number)), 'rb') as f:
+                self.maps[file_number] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self.maps[file_number]
+
+    # 读取区块的序列化数据（复制一份，不占用映射）
+    def read_block(self, key: bytes | str | int) -> bytes:
+        return bytes(self.view_block(key))
+
+    def get_block(self, key: bytes | str | int) -> BLOCK:
+        block, _ = BLOCK.unpack_from(self.read_block(key))
+        return block
+
+    def height(self, key: bytes | str) -> int:
+        key = bytes.fromhex(key) if isinstance(key, str) else key
+        return self.index[key][0]
+
+    # 链顶区块头哈希
+    def tip(self) -> bytes | None:
+        return self.hashes[-1] if self.hashes else None
+
+    # 仍有视图在使用的映射无法立即关闭，交由垃圾回收释放
+    def unmap(self, file_number: int) -> None:
+        m = self.maps.pop(file_number, None)
+        if m is not None:
+            try:
+                m.close()
+            except BufferError:
+                pass
+
+    def close(self) -> None:
+        for file_number in list(self.maps):
+            self.unmap(file_number)
+
+    def __contains__(self, key: bytes | str) -> bool:
+        key = bytes.fromhex(key) if isinstance(key, str) else key
+        return key in self.index
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def __enter__(self) -> 'BlockChain':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
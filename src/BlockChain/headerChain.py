@@ -0,0 +1,116 @@
+'''
+@File     : headerChain.py
+@Time     : 2025/01/06 10:31:52
+@Author   : H.SEON
+@Contact  : dsj34473@163.com
+'''
+
+import sys
+sys.path.append('.')
+from hashlib import sha256
+from src.BlockChain.block import BlockHeader
+from src.BlockChain.CONF.Global import *
+from src.V.v1.CONFIG import *
+
+# 区块头中前一区块头哈希的位置
+PREVIOUS_HASH_OFFSET = len(VERSION_SERIALIZE)
+
+# 区块头链
+# 区块头按 BLOCK_HEADER_SERIALIZE 格式连续存放在一个 bytearray 中，
+# 高度 h 的区块头位于 [h * 72, (h + 1) * 72)；对外只返回 bytes 副本，
+# 不导出 records 的视图，否则之后的追加会因缓冲区被引用而失败
+class HeaderChain(object):
+    def __init__(self) -> None:
+        self.records = bytearray()
+        # 高度 -> 区块头哈希
+        self.hashes: list[bytes] = []
+        # 区块头哈希 -> 高度
+        self.heights: dict[bytes, int] = {}
+
+    @staticmethod
+    def from_blockchain(blockchain: 'BlockChain') -> 'HeaderChain':
+        header_chain = HeaderChain()
+        for height in range(len(blockchain)):
+            view = blockchain.view_block(height)
+            header_chain.add_header(view[:len(BLOCK_HEADER_SERIALIZE)])
+            view.release()
+        return header_chain
+
+    # 追加区块头，返回其高度
+    def add_header(self, header: BlockHeader | bytes | memoryview) -> int:
+        record = header.serialize() if isinstance(header, BlockHeader) else bytes(header)
+        if len(record) != len(BLOCK_HEADER_SERIALIZE):
+            raise ValueError('Invalid block_header')
+        hash = sha256(record).digest()
+        if hash in self.heights:
+            return self.heights[hash]
+        if self.hashes and record[PREVIOUS_HASH_OFFSET:PREVIOUS_HASH_OFFSET + len(HASH_SERIALIZE)] != self.hashes[-1]:
+            raise ValueError('Block header does not extend the chain')
+        height = len(self.hashes)
+        self.records += record
+        self.hashes.append(hash)
+        self.heights[hash] = height
+        return height
+
+    # 高度处区块头的序列化数据
+    def header(self, height: int) -> bytes:
+        return self.slice(height, height + 1)
+
+    # 高度 [start, end) 的区块头拼接，只复制一次
+    def slice(self, start: int, end: int) -> bytes:
+        size = len(BLOCK_HEADER_SERIALIZE)
+        with memoryview(self.records) as view:
+            return bytes(view[start * size:end * size])
+
+    def tip(self) -> bytes | None:
+        return self.hashes[-1] if self.hashes else None
+
+    # 区块定位器：链顶起最近的若干区块逐个列出，之后步长加倍，最后为创世区块
+    def locator(self) -> list[bytes]:
+        locator = []
+        height, step = len(self.hashes) - 1, 1
+        while height > 0:
+            locator.append(self.hashes[height])
+            if len(locator) >= LOCATOR_DENSE_COUNT:
+                step *= 2
+            height -= step
+        if self.hashes:
+            locator.append(self.hashes[0])
+        return locator
+
+    # 定位器中第一个位于本链上的区块高度，均不在链上时为 -1
+    def fork_height(self, locator: list[bytes]) -> int:
+        for hash in locator:
+            if hash in self.heights:
+                return self.heights[hash]
+        return -1
+
+    # 应答 getheaders：分叉点之后至多 count 个区块头（遇到 stop_hash 为止）的拼接
+    def headers_after(self,
+        locator: list[bytes],
+        stop_hash: bytes = b'\x00' * len(HASH_SERIALIZE),
+        count: int = MAX_HEADERS_RESULTS
+    ) -> bytes:
+        start = self.fork_height(locator) + 1
+        end = min(start + count, len(self.hashes))
+        if stop_hash in self.heights and self.heights[stop_hash] >= start:
+            end = min(end, self.heights[stop_hash] + 1)
+        return self.slice(start, max(start, end))
+
+    def get_headers(self,
+        locator: list[bytes],
+        stop_hash: bytes = b'\x00' * len(HASH_SERIALIZE),
+        count: int = MAX_HEADERS_RESULTS
+    ) -> list[BlockHeader]:
+        data = self.headers_after(locator, stop_hash, count)
+        headers, offset = [], 0
+        while offset < len(data):
+            header, offset = BlockHeader.unpack_from(data, offset)
+            headers.append(header)
+        return headers
+
+    def __contains__(self, hash: bytes) -> bool:
+        return hash in self.heights
+
+    def __len__(self) -> int:
+        return len(self.hashes)
@@ -0,0 +1,94 @@
+'''
+@File     : undo.py
+@Time     : 2025/01/08 15:42:09
+@Author   : H.SEON
+@Contact  : dsj34473@163.com
+'''
+
+import sys
+sys.path.append('.')
+import os
+from src.utils.data import compactSize
+from src.BlockChain.CONF.Global import *
+from src.Transaction.transaction import TxOut
+from src.V.v1.CONFIG import *
+
+# 撤销日志
+# 每个已连接区块一条记录：记录头之后为被花费输出的个数，以及逐个的 特定输出 + TxOut，
+# 与区块文件存放在同一目录，断开区块时按记录恢复未花费输出集合
+class UndoJournal(object):
+    def __init__(self, path: str) -> None:
+        self.path = os.path.join(path, UNDO_FILE_NAME)
+        # 高度 -> 记录偏移
+        self.offsets: list[int] = []
+        self.size = 0
+        os.makedirs(path, exist_ok=True)
+        self.load()
+
+    # 只读取记录头，忽略未写完整的末尾记录
+    def load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb') as f:
+            while True:
+                header = f.read(len(UNDO_RECORD_SERIALIZE))
+                if len(header) < len(UNDO_RECORD_SERIALIZE):
+                    break
+                _, height, length, _ = UNDO_RECORD_SERIALIZE.unpack_from(header)
+                if height != len(self.offsets) or self.size + len(header) + length > os.path.getsize(self.path):
+                    break
+                self.offsets.append(self.size)
+                self.size += len(header) + length
+                f.seek(self.size)
+        if self.size != os.path.getsize(self.path):
+            os.truncate(self.path, self.size)
+
+    @staticmethod
+    def serialize(spent: list[tuple[tuple[bytes, int], TxOut]]) -> bytes:
+        return compactSize(len(spent)).serialize() + b''.join(
+            OUTPOINT_SERIALIZE.serialize(*key) + txout.serialize() for key, txout in spent
+        )
+
+    @staticmethod
+    def deserialize(data: bytes | memoryview) -> list[tuple[tuple[bytes, int], TxOut]]:
+        count, offset = compactSize.unpack_from(data)
+        spent = []
+        for _ in range(count):
+            txid, index, offset = OUTPOINT_SERIALIZE.unpack_from(data, offset)
+            txout, offset = TxOut.unpack_from(data, offset)
+            spent.append(((txid, index), txout))
+        return spent
+
+    # 追加高度处区块的撤销记录，已有更高记录时先截断
+    def write(self, height: int, hash: bytes, spent: list[tuple[tuple[bytes, int], TxOut]]) -> None:
+        if height > len(self.offsets):
+            raise ValueError('Undo record does not extend the journal')
+        self.truncate(height)
+        data = self.serialize(spent)
+        with open(self.path, 'ab') as f:
+            f.write(UNDO_RECORD_SERIALIZE.serialize(hash, height, len(data)))
+            f.write(data)
+        self.offsets.append(self.size)
+        self.size += len(UNDO_RECORD_SERIALIZE) + len(data)
+
+    # 读取高度处区块的撤销记录，区块头哈希不符时报错
+    def read(self, height: int, hash: bytes) -> list[tuple[tuple[bytes, int], TxOut]]:
+        if not 0 <= height < len(self.offsets):
+            raise KeyError('Undo record not found')
+        with open(self.path, 'rb') as f:
+            f.seek(self.offsets[height])
+            record_hash, _, length, _ = UNDO_RECORD_SERIALIZE.unpack_from(f.read(len(UNDO_RECORD_SERIALIZE)))
+            if record_hash != hash:
+                raise ValueError('Undo record does not match the block')
+            return self.deserialize(f.read(length))
+
+    # 丢弃高度不低于 height 的记录
+    def truncate(self, height: int) -> None:
+        if height >= len(self.offsets):
+            return
+        self.size = self.offsets[height]
+        del self.offsets[height:]
+        os.truncate(self.path, self.size)
+
+    def __len__(self) -> int:
+        return len(self.offsets)
@@ -0,0 +1,173 @@
+'''
+@File     : utxo.py
+@Time     : 2025/01/08 10:04:26
+@Author   : H.SEON
+@Contact  : dsj34473@163.com
+'''
+
+import sys
+sys.path.append('.')
+import os
+import sqlite3
+from collections import OrderedDict
+from src.BlockChain.block import BLOCK
+from src.BlockChain.undo import UndoJournal
+from src.BlockChain.CONF.Global import *
+from src.Transaction.transaction import TRANSACTION, TxOut, outpoint
+
+CREATETABLE_UTXO = '''CREATE TABLE IF NOT EXISTS UTXO (
+    TXID BLOB NOT NULL,
+    OUTPUT_INDEX INTEGER NOT NULL,
+    TXOUT BLOB NOT NULL,
+    PRIMARY KEY (TXID, OUTPUT_INDEX)
+    ) WITHOUT ROWID;'''
+CREATETABLE_STATE = '''CREATE TABLE IF NOT EXISTS STATE (
+    ID INTEGER PRIMARY KEY CHECK (ID = 0),
+    HEIGHT INTEGER NOT NULL
+    );'''
+SELECT_UTXO = 'SELECT TXOUT FROM UTXO WHERE TXID = ? AND OUTPUT_INDEX = ?;'
+INSERT_UTXO = 'INSERT OR REPLACE INTO UTXO (TXID, OUTPUT_INDEX, TXOUT) VALUES (?, ?, ?);'
+DELETE_UTXO = 'DELETE FROM UTXO WHERE TXID = ? AND OUTPUT_INDEX = ?;'
+SELECT_HEIGHT = 'SELECT HEIGHT FROM STATE WHERE ID = 0;'
+UPDATE_HEIGHT = 'INSERT OR REPLACE INTO STATE (ID, HEIGHT) VALUES (0, ?);'
+
+# 未花费输出集合
+# 以 (交易ID, 输出索引) 为键，写回式 LRU 缓存位于 SQLite 表之前：
+# 修改只记入缓存与脏表，每个区块连接完成后在一个事务中批量落盘
+class UTXOSet(object):
+    def __init__(self,
+        path: str,
+        cache_size: int = UTXO_CACHE_SIZE
+    ) -> None:
+        os.makedirs(path, exist_ok=True)
+        self.cache_size = cache_size
+        # 键 -> TxOut，None 表示不存在或已花费
+        self.cache: OrderedDict[tuple[bytes, int], TxOut | None] = OrderedDict()
+        # 尚未落盘的修改
+        self.dirty: dict[tuple[bytes, int], TxOut | None] = {}
+        self.conn = sqlite3.connect(os.path.join(path, UTXO_FILE_NAME))
+        self.conn.execute(CREATETABLE_UTXO)
+        self.conn.execute(CREATETABLE_STATE)
+        self.conn.commit()
+        row = self.conn.execute(SELECT_HEIGHT).fetchone()
+        # 已连接的最高区块高度
+        self.height = row[0] if row else -1
+        # 撤销日志中高于已连接高度的记录来自未落盘的区块
+        self.journal = UndoJournal(path)
+        self.journal.truncate(self.height + 1)
+
+    @staticmethod
+    def key(previous_output: outpoint) -> tuple[bytes, int]:
+        return bytes.fromhex(previous_output.hash), previous_output.index
+
+    def get(self, key: tuple[bytes, int]) -> TxOut | None:
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            return self.cache[key]
+        row = self.conn.execute(SELECT_UTXO, key).fetchone()
+        txout = TxOut.deserialize(row[0]) if row else None
+        self.cache[key] = txout
+        self.trim()
+        return txout
+
+    def add(self, key: tuple[bytes, int], txout: TxOut) -> None:
+        self.cache[key] = txout
+        self.cache.move_to_end(key)
+        self.dirty[key] = txout
+
+    # 花费输出，返回被花费的 TxOut
+    def spend(self, key: tuple[bytes, int]) -> TxOut:
+        txout = self.get(key)
+        if txout is None:
+            raise ValueError('Output is missing or already spent')
+        self.cache[key] = None
+        self.dirty[key] = None
+        return txout
+
+    # 连接区块，返回被花费的 (键, TxOut)；任一输入无法花费时撤销本区块的全部修改
+    def connect_block(self, block: BLOCK, height: int) -> list[tuple[tuple[bytes, int], TxOut]]:
+        if height != self.height + 1:
+            raise ValueError('Block does not extend the UTXO set')
+        spent = []
+        try:
+            for txn in block.txns:
+                if not isinstance(txn, TRANSACTION):
+                    continue
+                for tx_in in txn.tx_in:
+                    key = self.key(tx_in.previous_output)
+                    spent.append((key, self.spend(key)))
+                for index, tx_out in enumerate(txn.tx_out):
+                    self.add((txn.txid, index), tx_out)
+        except ValueError:
+            self.rollback()
+            raise
+        self.journal.write(height, bytes.fromhex(block.block_header._hash()), spent)
+        self.flush(height)
+        return spent
+
+    # 重新连接区块存储中高于已连接高度的区块，返回连接的区块数
+    # 区块已写入存储但未连接时进程中断会留下这样的缺口，启动时据此补齐
+    def catch_up(self, blockchain: 'BlockChain') -> int:
+        start = self.height + 1
+        for height in range(start, len(blockchain)):
+            self.connect_block(blockchain.get_block(height), height)
+        return max(len(blockchain) - start, 0)
+
+    # 断开链顶区块：按撤销记录逆序删除其创建的输出并恢复其花费的输出
+    def disconnect_block(self, block: BLOCK) -> None:
+        height = self.height
+        spent = self.journal.read(height, bytes.fromhex(block.block_header._hash()))
+        try:
+            for txn in reversed(block.txns):
+                if not isinstance(txn, TRANSACTION):
+                    continue
+                for index in range(len(txn.tx_out)):
+                    self.spend((txn.txid, index))
+                for _ in txn.tx_in:
+                    self.add(*spent.pop())
+        except (ValueError, IndexError):
+            self.rollback()
+            raise ValueError('Undo record does not match the block')
+        self.flush(height - 1)
+        self.journal.truncate(height)
+
+    # 将脏表在一个事务中写入数据库
+    def flush(self, height: int | None = None) -> None:
+        with self.conn:
+            self.conn.executemany(DELETE_UTXO, [key for key, txout in self.dirty.items() if txout is None])
+            self.conn.executemany(INSERT_UTXO, [
+                (*key, txout.serialize()) for key, txout in self.dirty.items() if txout is not None
+            ])
+            if height is not None:
+                self.conn.execute(UPDATE_HEIGHT, (height,))
+        if height is not None:
+            self.height = height
+        self.dirty.clear()
+        self.trim()
+
+    # 丢弃尚未落盘的修改
+    def rollback(self) -> None:
+        for key in self.dirty:
+            self.cache.pop(key, None)
+        self.dirty.clear()
+
+    # 按最近最少使用淘汰已落盘的缓存条目
+    def trim(self) -> None:
+        for _ in range(len(self.cache) - self.cache_size):
+            key, txout = self.cache.popitem(last=False)
+            if key in self.dirty:
+                self.cache[key] = txout
+
+    def __contains__(self, key: tuple[bytes, int]) -> bool:
+        return self.get(key) is not None
+
+    def close(self) -> None:
+        if self.dirty:
+            self.flush()
+        self.conn.close()
+
+    def __enter__(self) -> 'UTXOSet':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
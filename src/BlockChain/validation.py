@@ -0,0 +1,161 @@
+'''
+@File     : validation.py
+@Time     : 2025/01/11 09:26:57
+@Author   : H.SEON
+@Contact  : dsj34473@163.com
+'''
+
+import sys
+sys.path.append('.')
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from src.BlockChain.block import BLOCK, MerkleTree
+from src.BlockChain.CONF.Global import *
+from src.Transaction.transaction import TRANSACTION, TxOut, AuditMission
+from src.V.v1.CONFIG import *
+
+# 交易的上下文无关检查，不通过时返回原因
+def check_transaction(tx: TRANSACTION) -> str | None:
+    if len(tx) > MAX_BLOCK_SIZE:
+        return 'Transaction is too large'
+    # 只有区块首笔 ATM 交易可以没有输入，其余交易无输入即凭空发行面值
+    if not tx.tx_in:
+        return 'Transaction has no inputs'
+    if not tx.tx_out:
+        return 'Transaction has no outputs'
+    keys = set()
+    for tx_in in tx.tx_in:
+        if len(tx_in.signature_script) > MAX_SIGNATURE_SCRIPT_SIZE:
+            return 'Signature script is too large'
+        key = (tx_in.previous_output.hash, tx_in.previous_output.index)
+        if key in keys:
+            return 'Duplicate inputs'
+        keys.add(key)
+    total = 0
+    for tx_out in tx.tx_out:
+        if len(tx_out.pk_script) > MAX_PK_SCRIPT_SIZE:
+            return 'Public key script is too large'
+        if not 0 <= tx_out.value <= MAX_MONEY:
+            return 'Output value out of range'
+        total += tx_out.value
+        if total > MAX_MONEY:
+            return 'Total output value out of range'
+    return None
+
+def check_chunk(txns: list[TRANSACTION]) -> list[str | None]:
+    return [check_transaction(tx) for tx in txns]
+
+# 工作进程入口：data 为 count 笔交易序列化数据的拼接（memoryview 无法跨进程传递）
+def check_transactions(data: bytes, count: int) -> list[str | None]:
+    errors, offset = [], 0
+    for _ in range(count):
+        try:
+            tx, offset = TRANSACTION.unpack_from(data, offset)
+        except ValueError as e:
+            errors.append(str(e))
+            break
+        errors.append(check_transaction(tx))
+    return errors
+
+# 区块验证
+# 交易的上下文无关检查按块分发到执行器（默认线程池，也可传入进程池），
+# 依赖未花费输出集合的检查在当前线程中顺序进行
+class BlockValidator(object):
+    def __init__(self,
+        utxo: 'UTXOSet',
+        workers: int = VALIDATION_WORKERS,
+        chunk_size: int = VALIDATION_CHUNK_SIZE,
+        executor: Executor | None = None,
+        scripts: 'ScriptCache | None' = None
+    ) -> None:
+        self.utxo = utxo
+        self.scripts = scripts
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.executor = executor
+        self.own_executor = False
+
+    def get_executor(self) -> Executor | None:
+        if self.executor is None and self.workers > 1:
+            self.executor, self.own_executor = ThreadPoolExecutor(self.workers), True
+        return self.executor
+
+    # 上下文无关检查：区块大小、首笔 ATM 交易、默克尔根与各笔交易
+    def check_block(self, block: BLOCK) -> None:
+        if len(block) > MAX_BLOCK_SIZE:
+            raise ValueError('Block is too large')
+        if not block.txns or not isinstance(block.txns[0], AuditMission) \
+            or any(not isinstance(txn, TRANSACTION) for txn in block.txns[1:]):
+            raise ValueError('Block must start with exactly one ATM transaction')
+        txids = [txn.txid for txn in block.txns]
+        if MerkleTree.root_of(txids).hex() != block.block_header.merkle_root_hash:
+            raise ValueError('Merkle root is not correct')
+        if len(set(txids)) != len(txids):
+            raise ValueError('Duplicate transactions')
+        txns = block.txns[1:]
+        executor = self.get_executor() if len(txns) > self.chunk_size else None
+        chunks = [txns[i:i + self.chunk_size] for i in range(0, len(txns), self.chunk_size)]
+        if executor is None:
+            errors = [check_transaction(txn) for txn in txns]
+        elif isinstance(executor, ProcessPoolExecutor):
+            errors = [
+                error for chunk in executor.map(
+                    check_transactions,
+                    [b''.join(bytes(txn.raw()) for txn in chunk) for chunk in chunks],
+                    [len(chunk) for chunk in chunks]
+                ) for error in chunk
+            ]
+        else:
+            errors = [error for chunk in executor.map(check_chunk, chunks) for error in chunk]
+        for index, error in enumerate(errors, 1):
+            if error is not None:
+                raise ValueError(f'Transaction {index}: {error}')
+
+    # 依赖未花费输出集合的检查：输入存在且未被重复花费，脚本验证通过，输入总额不小于输出总额
+    def check_inputs(self, block: BLOCK) -> int:
+        created: dict[tuple[bytes, int], TxOut] = {}
+        spent: set[tuple[bytes, int]] = set()
+        fees = 0
+        for txn in block.txns[1:]:
+            txouts = []
+            for tx_in in txn.tx_in:
+                key = self.utxo.key(tx_in.previous_output)
+                if key in spent:
+                    raise ValueError('Output is spent twice in the block')
+                spent.add(key)
+                txout = created[key] if key in created else self.utxo.get(key)
+                if txout is None:
+                    raise ValueError('Output is missing or already spent')
+                txouts.append(txout)
+            if self.scripts is not None:
+                self.scripts.verify_inputs(txn, txouts)
+            value_in = sum(txout.value for txout in txouts)
+            value_out = sum(tx_out.value for tx_out in txn.tx_out)
+            if value_in < value_out:
+                raise ValueError('Outputs exceed inputs')
+            fees += value_in - value_out
+            for index, tx_out in enumerate(txn.tx_out):
+                created[(txn.txid, index)] = tx_out
+        return fees
+
+    # 返回区块手续费总额
+    def validate(self, block: BLOCK) -> int:
+        self.check_block(block)
+        return self.check_inputs(block)
+
+    # 在事件循环中验证：上下文无关检查经 run_in_executor 执行，不阻塞事件循环；
+    # 未花费输出集合的 SQLite 连接只能在创建它的线程中使用，输入检查仍在当前线程进行
+    async def validate_async(self, block: BLOCK) -> int:
+        await asyncio.get_running_loop().run_in_executor(None, self.check_block, block)
+        return self.check_inputs(block)
+
+    def close(self) -> None:
+        if self.own_executor:
+            self.executor.shutdown()
+            self.executor, self.own_executor = None, False
+
+    def __enter__(self) -> 'BlockValidator':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
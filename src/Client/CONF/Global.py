@@ -5,3 +5,5 @@
 @Contact  : dsj34473@163.com
 '''
 
+# 节点数据目录，各节点的区块存储位于其下以节点标识命名的子目录
+DATA_PATH = 'data'
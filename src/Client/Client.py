@@ -9,12 +9,19 @@ import sys
 sys.path.append('.')
 from time import time
 from src.PeerToPeerNetwork.Msg import Version, PAYLOAD
-from src.PeerToPeerNetwork.P2PNetwork import Peer, RecvPeer, TransPeer
+from src.PeerToPeerNetwork.P2PNetwork import Peer, RecvPeer, TransPeer, MessageQueue
 from src.PeerToPeerNetwork.NetConf.Global import IDENTIFIER_SERIALIZE
+from src.BlockChain.blockChain import BlockChain
+from src.BlockChain.utxo import UTXOSet
+from src.BlockChain.validation import BlockValidator
+from src.Transaction.mempool import MemoryPool
+from src.Transaction.script import ScriptCache
+from src.Client.CONF.Global import *
 from hashlib import sha256
-from asyncio import LifoQueue, run
+from asyncio import run
 import logging
 import asyncio
+import os
 logging.basicConfig(filename='logs/logs.log', level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s', datefmt='%Y-%m-%d %H:%M:%S', encoding='utf8')
 
 class CLIENT(object):
@@ -58,6 +65,9 @@ class CLIENT(object):
             TOP_RECV_SERVICES=TOP_RECV_SERVICES, TOP_RECV_IP_ADDRESS=TOP_RECV_IP_ADDRESS, TOP_RECV_PORT=TOP_RECV_PORT
         ):
             return False
+
+        if not self.ready_blockchain():
+            return False
         
         if not self.ready_recv(
             listen=client_listen
@@ -78,7 +88,10 @@ class CLIENT(object):
             payload, data = payload if not isinstance(payload, tuple) else (payload, b'')
             if data:
                 self.logger.warning(f'Received a payload with more {len(data)}.L.bytes')
-            payload.act(self)
+            # 耗时的动作（如区块验证）返回协程，等待其完成
+            result = payload.act(self)
+            if asyncio.iscoroutine(result):
+                await result
             self.logger.info(f'do a action: {data.hex()}')
 
     def ready_state(self,
@@ -89,8 +102,8 @@ class CLIENT(object):
         TOP_RECV_SERVICES: int, TOP_RECV_IP_ADDRESS: str, TOP_RECV_PORT: int
     ) -> bool:
         from src.PeerToPeerNetwork.Msg import Addr, NetworkIPAddress
-        self.actSequence = LifoQueue()
-        self.mesSequence = LifoQueue()
+        self.actSequence = MessageQueue()
+        self.mesSequence = MessageQueue()
         ADDR = Addr(
             start_string=start_string,
             IP_addresses=[
@@ -120,6 +133,32 @@ class CLIENT(object):
         )
         return True
 
+    def ready_blockchain(self) -> bool:
+        self.blockchain = BlockChain(
+            path=os.path.join(DATA_PATH, self.logger.name)
+        )
+        self.utxo = UTXOSet(
+            path=os.path.join(DATA_PATH, self.logger.name)
+        )
+        self.scripts = ScriptCache()
+        self.mempool = MemoryPool(
+            utxo=self.utxo,
+            scripts=self.scripts
+        )
+        self.validator = BlockValidator(
+            utxo=self.utxo,
+            scripts=self.scripts
+        )
+        self.logger.info(f'Loaded {len(self.blockchain)} blocks from the blockchain')
+        try:
+            count = self.utxo.catch_up(self.blockchain)
+        except ValueError as e:
+            self.logger.error(f'Failed to catch up the UTXO set at height {self.utxo.height + 1}: {e}')
+            return False
+        if count:
+            self.logger.info(f'Connected {count} stored blocks to the UTXO set')
+        return True
+
     def ready_recv(self,
             listen: int | tuple[int, int]
         ) -> bool:
@@ -11,13 +11,16 @@ from hashlib import sha256
 from src.V.v1.CONFIG import *
 from src.utils.data import compactSize
 from typing import TypeAlias
-from src.BlockChain.block import BLOCK, BlockHeader
+from src.BlockChain.block import BLOCK, BlockHeader, PartialMerkleTree
 from src.PeerToPeerNetwork.NetConf.Global import *
 from src.Transaction.transaction import TRANSACTION, TxIn, TxOut, outpoint
 from abc import ABC, abstractmethod
 
 # 消息类
 class MSG(ABC):
+    # 命令名 -> (消息类, 负载类)
+    REGISTRY: dict[bytes, tuple[type['MSG'], type['PAYLOAD']]] = {}
+
     @abstractmethod
     def __init__(self,
         start_string: bytes | int,
@@ -29,6 +32,17 @@ class MSG(ABC):
     def serialize(self) -> bytes:
         pass
 
+    # 报头与负载的缓冲区列表，发送时分散写出，不拼接成一整段字节
+    def buffers(self) -> list[bytes | memoryview]:
+        return [self.message_header.serialize(), *self.payload.buffers()]
+
+    # 将整条消息追加到调用方提供的缓冲区，返回写入的字节数
+    def serialize_into(self, buffer: bytearray) -> int:
+        start = len(buffer)
+        buffer += self.message_header.serialize()
+        self.payload.serialize_into(buffer)
+        return len(buffer) - start
+
     @staticmethod
     @abstractmethod
     def deserialize(data: bytes) -> 'MSG':
@@ -38,62 +52,53 @@ class MSG(ABC):
     def __str__(self) -> str:
         pass
 
+    # 由已解析的报头与负载直接组装消息，不再重新计算负载长度与校验和
+    @classmethod
+    def _wrap(cls,
+        message_header: 'MessageHeader',
+        payload: 'PAYLOAD'
+    ) -> 'MSG':
+        message = cls.__new__(cls)
+        message.message_header = message_header
+        message.payload = payload
+        return message
+
+    # 注册消息类型：命令名（按 COMMAND_NAME_SERIALIZE 填充）-> (消息类, 负载类)
+    @staticmethod
+    def register(
+        command_name: bytes,
+        message: type['MSG'],
+        payload: type['PAYLOAD']
+    ) -> None:
+        MSG.REGISTRY[COMMAND_NAME_SERIALIZE.serialize(command_name)] = (message, payload)
+
     @staticmethod
     def toMSG(data: bytes) -> 'MSG':
-        message_header = MessageHeader.deserialize(data)
-        message_header, data = message_header if isinstance(message_header, tuple) else (message_header, b'')
-        message = MSG._toMSG(message_header, data)
-        message, data = message if isinstance(message, tuple) else (message, b'')
-        if message_header.checksum != message.payload._hash()[:len(CHECKSUM_SERIALIZE)]:
-            raise ValueError('Checksum is not correct')
-        return message if not data else (
-            message,
-            data
-        )
-    
+        data = memoryview(data)
+        message, offset = MSG.unpack_from(data)
+        return message if offset == len(data) else (message, data[offset:])
+
+    # 报头只解析一次，按命令名查表后直接在原缓冲区上解码负载
     @staticmethod
-    def _toMSG(
-        message_header: 'MessageHeader',
-        data: bytes
-    ) -> 'MSG':
-        data = message_header.serialize() + data
-        command_name = message_header.command_name
-        if command_name == case_block:
-            return Block.deserialize(data)
-        elif command_name == case_getblocks:
-            return GetBlocks.deserialize(data)
-        elif command_name == case_inv:
-            return Inv.deserialize(data)
-        elif command_name == case_getdata:
-            return GetData.deserialize(data)
-        elif command_name == case_getheaders:
-            return GetHeaders.deserialize(data)
-        elif command_name == case_headers:
-            return Headers.deserialize(data)
-        elif command_name == case_merkleblock:
-            return MerkleBlock.deserialize(data)
-        elif command_name == case_mempool:
-            return Mempool.deserialize(data)
-        elif command_name == case_tx:
-            return Tx.deserialize(data)
-        elif command_name == case_notfound:
-            return Notfound.deserialize(data)
-        elif command_name == case_addr:
-            return Addr.deserialize(data)
-        elif command_name == case_getaddr:
-            return GetAddr.deserialize(data)
-        elif command_name == case_ping:
-            return Ping.deserialize(data)
-        elif command_name == case_pong:
-            return Pong.deserialize(data)
-        elif command_name == case_sendheaders:
-            return SendHeaders.deserialize(data)
-        elif command_name == case_verack:
-            return VerAck.deserialize(data)
-        elif command_name == case_version:
-            return Version.deserialize(data)
-        else:
+    def unpack_from(data: bytes | memoryview, offset: int = 0) -> tuple['MSG', int]:
+        data = memoryview(data)
+        message_header, offset = MessageHeader.unpack_from(data, offset)
+        if message_header.command_name not in MSG.REGISTRY:
             raise ValueError('Command name is not correct')
+        message, payload = MSG.REGISTRY[message_header.command_name]
+        end = offset + message_header.payload_size
+        if end > len(data):
+            raise ValueError('Payload is incomplete')
+        # 校验和只对原始负载字节计算一次，校验失败的帧不会构造任何负载对象
+        if message_header.checksum != payload.checksum(data[offset:end]):
+            raise ValueError('Checksum is not correct')
+        payload, offset = payload.unpack_from(data[:end], offset)
+        if offset != end:
+            raise ValueError('Payload size is not correct')
+        return message._wrap(
+            message_header=message_header,
+            payload=payload
+        ), end
 
 
 # PAYLOAD
@@ -106,11 +111,27 @@ class PAYLOAD(ABC):
     @abstractmethod
     def serialize(self) -> bytes:
         pass
+
+    # 负载的缓冲区列表，默认即序列化结果；大负载可覆盖以避免拼接
+    def buffers(self) -> list[bytes | memoryview]:
+        return [self.serialize()]
+
+    # 将负载追加到调用方提供的缓冲区，返回写入的字节数
+    def serialize_into(self, buffer: bytearray) -> int:
+        start = len(buffer)
+        for data in self.buffers():
+            buffer += data
+        return len(buffer) - start
     
     @staticmethod
     @abstractmethod
     def deserialize(data: bytes) -> 'PAYLOAD':
         pass
+
+    @staticmethod
+    @abstractmethod
+    def unpack_from(data: bytes | memoryview, offset: int = 0) -> tuple['PAYLOAD', int]:
+        pass
     
     @abstractmethod
     def __str__(self) -> str:
@@ -124,6 +145,11 @@ class PAYLOAD(ABC):
     def _hash(self) -> bytes:
         pass
 
+    # 由原始负载字节计算校验和
+    @staticmethod
+    def checksum(data: bytes | memoryview) -> bytes:
+        return sha256(data).digest()[:len(CHECKSUM_SERIALIZE)]
+
     # @abstractmethod
     # def act(self, client: 'CLIENT') -> None:
     #     pass
@@ -153,21 +179,19 @@ class MessageHeader(object):
     
     @staticmethod
     def deserialize(data):
-        start_string, command_name, payload_size, checksum, data = MESSAGE_HEADER_SERIALIZE.deserialize(data)
+        data = memoryview(data)
+        message_header, offset = MessageHeader.unpack_from(data)
+        return message_header if offset == len(data) else (message_header, data[offset:])
+
+    @staticmethod
+    def unpack_from(data: bytes | memoryview, offset: int = 0) -> tuple['MessageHeader', int]:
+        start_string, command_name, payload_size, checksum, offset = MESSAGE_HEADER_SERIALIZE.unpack_from(data, offset)
         return MessageHeader(
             start_string=start_string,
             command_name=command_name,
             payload_size=payload_size,
             checksum=checksum
-        ) if not data else (
-            MessageHeader(
-                start_string=start_string,
-                command_name=command_name,
-                payload_size=payload_size,
-                checksum=checksum
-            ),
-            data
-        )
+        ), offset
 
     def __str__(self):
         start_string = START_STRING_SERIALIZE.serialize(self.start_string).hex()
@@ -193,17 +217,18 @@ class INVENTORY(object):
 
     @staticmethod
     def deserialize(data: bytes) -> 'INVENTORY':
-        type_identifier, hash, data = INVENTORY_SERIALIZE.deserialize(data)
+        data = memoryview(data)
+        inv, offset = INVENTORY.unpack_from(data)
+        return inv if offset == len(data) else (inv, data[offset:])
+
+    @staticmethod
+    def unpack_from(data: bytes | memoryview, offset: int = 0) -> tuple['INVENTORY', int]:
+        type_identifier, hash, offset = INVENTORY_SERIALIZE.unpack_from(data, offset)
         return INVENTORY(
             type_identifier=type_identifier,
             hash = hash
-        ) if not data else (
-            INVENTORY(
-                type_identifier=type_identifier,
-                hash = hash
-            ),
-            data
-        )
+        ), offset
+
     def __str__(self):
         type_identifier = TYPE_IDENTIFIER_SERIALIZE.serialize(self.type_identifier).hex()
         hash = HASH_SERIALIZE.serialize(self.hash).hex()
@@ -230,7 +255,7 @@ class Block(MSG):
         )
     
     def serialize(self) -> bytes:
-        return self.message_header.serialize() + self.payload.serialize()
+        return b''.join(self.buffers())
     
     @staticmethod
     def deserialize(data: bytes) -> 'Block':
@@ -245,13 +270,13 @@ class Block(MSG):
         if message_header.checksum != payload._hash()[:len(CHECKSUM_SERIALIZE)]:
             raise ValueError('Checksum is not correct')
         
-        return Block(
-            start_string=message_header.start_string,
-            block=payload.block
+        return Block._wrap(
+            message_header=message_header,
+            payload=payload
         ) if not data else (
-            Block(
-                start_string=message_header.start_string,
-                block=payload.block
+            Block._wrap(
+                message_header=message_header,
+                payload=payload
             ),
             data
         )
@@ -267,36 +292,67 @@ class Block_(PAYLOAD):
         block: BLOCK
     ):
         self.block = block
+        # 解码时保留的原始负载片段，用于校验和与转发
+        self._raw = None
     
     def serialize(self) -> bytes:
-        return self.block.serialize()
+        return self.block.serialize() if self._raw is None else bytes(self._raw)
+
+    # 原始线上字节：与 IMMUTABLE.raw 相同，解码得到的负载返回保留的片段，否则返回序列化结果
+    def raw(self) -> bytes | memoryview:
+        return self._raw if self._raw is not None else self.serialize()
+
+    # 解码得到的负载直接转发原始片段，否则按区块各段分散写出
+    def buffers(self) -> list[bytes | memoryview]:
+        return self.block.buffers() if self._raw is None else [self._raw]
     
     @staticmethod
     def deserialize(data: bytes) -> 'Block_':
-        block = BLOCK.deserialize(data)
-        block, data = block if isinstance(block, tuple) else (block, b'')
-        return Block_(
+        data = memoryview(data)
+        payload, offset = Block_.unpack_from(data)
+        return payload if offset == len(data) else (payload, data[offset:])
+
+    @staticmethod
+    def unpack_from(data: bytes | memoryview, offset: int = 0) -> tuple['Block_', int]:
+        data, start = memoryview(data), offset
+        block, offset = BLOCK.unpack_from(data, offset)
+        payload = Block_(
             block=block
-        ) if not data else (
-            Block_(
-                block=block
-            ),
-            data
         )
+        payload._raw = data[start:offset]
+        return payload, offset
 
+    # 按线上字节计算长度；MerkleBlock 的 len() 是交易数，不能直接使用
     def __len__(self) -> int:
-        return len(self.serialize())
+        return sum(len(data) for data in self.buffers())
     
     def __str__(self) -> str:
         return self.block.__str__().replace('\n', '\n\t')
     
     def _hash(self) -> bytes:
-        return sha256(self.serialize()).digest()
-    
-    def act(self, client: 'CLIENT') -> None:
-        client.blockchain.add_block(self.block)
-        client.logger.info(f'Added a block with height {self.block.header.height} into the blockchain')
-    
+        if self._raw is not None:
+            return sha256(self._raw).digest()
+        digest = sha256()
+        for data in self.block.buffers():
+            digest.update(data)
+        return digest.digest()
+    
+    # 区块验证经执行器进行，需在事件循环中等待
+    async def act(self, client: 'CLIENT') -> None:
+        try:
+            if self.block.block_header._hash() not in client.blockchain:
+                await client.validator.validate_async(self.block)
+            height = client.blockchain.add_block(self.block)
+            if height > client.utxo.height:
+                client.utxo.connect_block(self.block, height)
+                client.mempool.remove_block(self.block)
+        except ValueError as e:
+            client.logger.warning(f'Rejected a block {self.block.block_header._hash()}: {e}')
+            return
+        client.logger.info(f'Added a block with height {height} into the blockchain')
+    
+
+MSG.register(COMMAND_NAME_BLOCK, Block, Block_)
 
 # 定义GetBlocks消息类
 class GetBlocks(MSG):
@@ -372,25 +428,24 @@ class GetBlocks_(PAYLOAD):
     
     @staticmethod
     def deserialize(data: bytes) -> 'GetBlocks_':
-        version, data = VERSION_SERIALIZE.deserialize(data)
-        hash_count, data = compactSize.deserialize(data)
+        data = memoryview(data)
+        payload, offset = GetBlocks_.unpack_from(data)
+        return payload if offset == len(data) else (payload, data[offset:])
+
+    @staticmethod
+    def unpack_from(data: bytes | memoryview, offset: int = 0) -> tuple['GetBlocks_', int]:
+        version, offset = VERSION_SERIALIZE.unpack_from(data, offset)
+        hash_count, offset = compactSize.unpack_from(data, offset)
         block_header_hashes = []
         for _ in range(hash_count):
-            block_header_hashe, data = HASH_SERIALIZE.deserialize(data)
+            block_header_hashe, offset = HASH_SERIALIZE.unpack_from(data, offset)
             block_header_hashes.append(block_header_hashe)
-        stop_hash, data = HASH_SERIALIZE.deserialize(data)
+        stop_hash, offset = HASH_SERIALIZE.unpack_from(data, offset)
         return GetBlocks_(
             version=version,
             block_header_hashes=block_header_hashes,
             stop_hash=stop_hash
-        ) if not data else (
-            GetBlocks_(
-                version=version,
-                block_header_hashes=block_header_hashes,
-                stop_hash=stop_hash
-            ),
-            data
-        )
+        ), offset
     
     def __str__(self) -> str:
         version = VERSION_SERIALIZE.serialize(self.version).hex()
@@ -406,6 +461,8 @@ class GetBlocks_(PAYLOAD):
     def _hash(self) -> bytes:
         return sha256(self.serialize()).digest()
 
+MSG.register(COMMAND_NAME_GETBLOCKS, GetBlocks, GetBlocks_)
+
 # 定义Inv消息类
 class Inv(MSG):
     def __init__(self,
@@ -465,23 +522,20 @@ class Inv_(PAYLOAD):
 
     @staticmethod
     def deserialize(data: bytes) -> 'Inv_':
-        inventory_count, data = compactSize.deserialize(data)
+        data = memoryview(data)
+        payload, offset = Inv_.unpack_from(data)
+        return payload if offset == len(data) else (payload, data[offset:])
+
+    @staticmethod
+    def unpack_from(data: bytes | memoryview, offset: int = 0) -> tuple['Inv_', int]:
+        inventory_count, offset = compactSize.unpack_from(data, offset)
         inventory = []
-        for _ in range(inventory_count - 1):
-            inv, data = INVENTORY.deserialize(data)
-            inventory.append(inv)
-        else:
-            inv = INVENTORY.deserialize(data)
-            inv, data = inv if isinstance(inv, tuple) else (inv, b'')
+        for _ in range(inventory_count):
+            inv, offset = INVENTORY.unpack_from(data, offset)
             inventory.append(inv)
         return Inv_(
             inventory=inventory
-        ) if not data else (
-            Inv_(
-                inventory=inventory
-            ),
-            data
-        )
+        ), offset
 
     def __str__(self) -> str:
         inventory_count = compactSize.serialize(self.inventory_count).hex()
@@ -495,6 +549,8 @@ class Inv_(PAYLOAD):
     def _hash(self) -> bytes:
         return sha256(self.serialize()).digest()
 
+MSG.register(COMMAND_NAME_INV, Inv, Inv_)
+
 # 定义GetData消息类
 class GetData(MSG):
     def __init__(self,
@@ -546,6 +602,8 @@ class GetData(MSG):
 # 定义Payload_GetData消息类
 GetData_: TypeAlias = Inv_
 
+MSG.register(COMMAND_NAME_GETDATA, GetData, GetData_)
+
 # 定义GetHeaders消息类
 class GetHeaders(MSG):
     def __init__(self,
@@ -605,6 +663,8 @@ class GetHeaders(MSG):
 # 定义Payload_GetHeaders消息类
 GetHeaders_: TypeAlias = GetBlocks_
 
+MSG.register(COMMAND_NAME_GETHEADERS, GetHeaders, GetHeaders_)
+
 # 定义Headers消息类
 class Headers(MSG):
     def __init__(self,
@@ -668,22 +728,23 @@ class Headers_(PAYLOAD):
     
     @staticmethod
     def deserialize(data: bytes) -> 'Headers_':
-        count, data = compactSize.deserialize(data)
+        data = memoryview(data)
+        payload, offset = Headers_.unpack_from(data)
+        return payload if offset == len(data) else (payload, data[offset:])
+
+    @staticmethod
+    def unpack_from(data: bytes | memoryview, offset: int = 0) -> tuple['Headers_', int]:
+        count, offset = compactSize.unpack_from(data, offset)
         headers = []
         for _ in range(count):
-            header, data = BlockHeader.deserialize(data)
+            header, offset = BlockHeader.unpack_from(data, offset)
             headers.append(header)
-        tx_count, data = TX_COUNT_ON_HEADERS_SERIALIZE.deserialize(data)
+        tx_count, offset = TX_COUNT_ON_HEADERS_SERIALIZE.unpack_from(data, offset)
         if tx_count != TX_COUNT_ON_HEADERS:
             raise ValueError('TX_COUNT_ON_HEADERS is not correct')
         return Headers_(
             headers=headers
-        ) if not data else (
-            Headers_(
-                headers=headers
-            ),
-            data
-        )
+        ), offset
     
     def __str__(self) -> str:
         count = compactSize.serialize(self.count).hex()
@@ -698,6 +759,8 @@ class Headers_(PAYLOAD):
     def _hash(self) -> bytes:
         return sha256(self.serialize()).digest()
 
+MSG.register(COMMAND_NAME_HEADERS, Headers, Headers_)
+
 # 定义Payload_EMPTY消息类
 class EMPTY_(PAYLOAD):
     
@@ -709,10 +772,13 @@ class EMPTY_(PAYLOAD):
     
     @staticmethod
     def deserialize(data: bytes) -> 'EMPTY_':
-        return EMPTY_() if not data else (
-            EMPTY_(),
-            data
-        )
+        data = memoryview(data)
+        payload, offset = EMPTY_.unpack_from(data)
+        return payload if offset == len(data) else (payload, data[offset:])
+
+    @staticmethod
+    def unpack_from(data: bytes | memoryview, offset: int = 0) -> tuple['EMPTY_', int]:
+        return EMPTY_(), offset
     
     def __str__(self) -> str:
         return EMPTY_PAYLOAD.hex()
@@ -723,6 +789,10 @@ class EMPTY_(PAYLOAD):
     def _hash(self) -> bytes:
         return sha256(sha256(self.serialize()).digest()).digest()
 
+    @staticmethod
+    def checksum(data: bytes | memoryview) -> bytes:
+        return sha256(sha256(data).digest()).digest()[:len(CHECKSUM_SERIALIZE)]
+
 # 定义Mempool消息类
 class Mempool(MSG):
     def __init__(self,
@@ -770,6 +840,8 @@ class Mempool(MSG):
 # 定义Payload_Mempool消息类
 Mempool_: TypeAlias = EMPTY_
 
+MSG.register(COMMAND_NAME_MEMPOOL, Mempool, Mempool_)
+
 # 定义MerkleBlock消息类
 class MerkleBlock(MSG):
     def __init__(self,
@@ -777,7 +849,7 @@ class MerkleBlock(MSG):
         block_header: BlockHeader,
         transaction_count: int,
         hashes: list[bytes],
-        flags: int
+        flags: 'int | FLAGS'
     ):
         self.payload = MerkleBlock_(
             block_header=block_header,
@@ -832,14 +904,12 @@ class MerkleBlock_(PAYLOAD):
         block_header: 'BlockHeader',
         transaction_count: int,
         hashes: list[bytes],
-        flags: int
+        flags: 'int | FLAGS'
     ) -> None:
         self.flags = FLAGS(flags)
         self.flag_byte_count = compactSize(len(self.flags))
         self.hashes = hashes
         self.hash_count = compactSize(len(self.hashes))
-        if self.hash_count != self.flags.bit_count():
-            raise ValueError('Hash count is not equal to flag count')
         self.transaction_count = compactSize(transaction_count)
         self.block_header = block_header
 
@@ -854,32 +924,50 @@ class MerkleBlock_(PAYLOAD):
 
     @staticmethod
     def deserialize(data: bytes) -> 'MerkleBlock_':
-        block_header, data = BlockHeader.deserialize(data)
-        transaction_count, data = compactSize.deserialize(data)
-        hash_count, data = compactSize.deserialize(data)
+        data = memoryview(data)
+        payload, offset = MerkleBlock_.unpack_from(data)
+        return payload if offset == len(data) else (payload, data[offset:])
+
+    @staticmethod
+    def unpack_from(data: bytes | memoryview, offset: int = 0) -> tuple['MerkleBlock_', int]:
+        block_header, offset = BlockHeader.unpack_from(data, offset)
+        transaction_count, offset = compactSize.unpack_from(data, offset)
+        hash_count, offset = compactSize.unpack_from(data, offset)
         hashes = []
         for _ in range(hash_count):
-            hash, data = HASH_SERIALIZE.deserialize(data)
+            hash, offset = HASH_SERIALIZE.unpack_from(data, offset)
             hashes.append(hash)
-        flag_byte_count, data = compactSize.deserialize(data)
-        flags = FLAGS.deserialize(data, flag_byte_count)
-        flags, data = flags if isinstance(flags, tuple) else (flags, b'')
-
+        flag_byte_count, offset = compactSize.unpack_from(data, offset)
+        flags, offset = FLAGS.unpack_from(data, flag_byte_count, offset)
         return MerkleBlock_(
             block_header=block_header,
             transaction_count=transaction_count,
             hashes=hashes,
             flags=flags
-        ) if not data else (
-            MerkleBlock_(
-                block_header=block_header,
-                transaction_count=transaction_count,
-                hashes=hashes,
-                flags=flags
-            ),
-            data
+        ), offset
+
+    # 由区块与待证明的交易哈希生成
+    @staticmethod
+    def from_block(block: BLOCK, txids: set[bytes]) -> 'MerkleBlock_':
+        partial = PartialMerkleTree.build([txn.txid for txn in block.txns], txids)
+        return MerkleBlock_(
+            block_header=block.block_header,
+            transaction_count=partial.transaction_count,
+            hashes=partial.hashes,
+            flags=FLAGS.from_bits(partial.flags)
         )
 
+    # 重算默克尔根并与区块头比对，返回匹配的交易哈希
+    def verify(self) -> list[bytes]:
+        root, matches = PartialMerkleTree(
+            transaction_count=self.transaction_count,
+            hashes=self.hashes,
+            flags=self.flags
+        ).extract()
+        if root != bytes.fromhex(self.block_header.merkle_root_hash):
+            raise ValueError('Merkle root is not correct')
+        return matches
+
     def __len__(self) -> int:
         return len(self.serialize())
     
@@ -896,6 +984,8 @@ class MerkleBlock_(PAYLOAD):
     def _hash(self) -> bytes:
         return sha256(self.serialize()).digest()
 
+MSG.register(COMMAND_NAME_MERKLEBLOCK, MerkleBlock, MerkleBlock_)
+
 # 定义Tx消息类
 class Tx(MSG):
     def __init__(self,
@@ -913,7 +1003,7 @@ class Tx(MSG):
         )
     
     def serialize(self) -> bytes:
-        return self.message_header.serialize() + self.payload.serialize()
+        return b''.join(self.buffers())
 
     @staticmethod
     def deserialize(data: bytes) -> 'Tx':
@@ -924,13 +1014,13 @@ class Tx(MSG):
         payload, data = payload if isinstance(payload, tuple) else (payload, b'')
         if message_header.checksum != payload._hash()[:len(CHECKSUM_SERIALIZE)]:
             raise ValueError('Checksum is not correct')
-        return Tx(
-            start_string=message_header.start_string,
-            transaction=payload.transaction
+        return Tx._wrap(
+            message_header=message_header,
+            payload=payload
         ) if not data else (
-            Tx(
-                start_string=message_header.start_string,
-                transaction=payload.transaction
+            Tx._wrap(
+                message_header=message_header,
+                payload=payload
             ),
             data
         )
@@ -950,27 +1040,40 @@ class Tx_(PAYLOAD):
     def serialize(self) -> bytes:
         return self.transaction.serialize()
 
+    def buffers(self) -> list[bytes | memoryview]:
+        return [self.transaction.raw()]
+
     @staticmethod
     def deserialize(data: bytes) -> 'Tx_':
-        transaction = TRANSACTION.deserialize(data)
-        transaction, data = transaction if isinstance(transaction, tuple) else (transaction, b'')
+        data = memoryview(data)
+        payload, offset = Tx_.unpack_from(data)
+        return payload if offset == len(data) else (payload, data[offset:])
+
+    @staticmethod
+    def unpack_from(data: bytes | memoryview, offset: int = 0) -> tuple['Tx_', int]:
+        transaction, offset = TRANSACTION.unpack_from(data, offset)
         return Tx_(
             transaction=transaction
-        ) if not data else (
-            Tx_(
-                transaction=transaction
-            ),
-            data
-        )
+        ), offset
 
     def __len__(self) -> int:
-        return len(self.serialize())
+        return len(self.transaction)
     
     def __str__(self) -> str:
         return self.transaction.__str__().replace('\n', '\n\t')
 
+    # 负载即交易本身，复用已缓存的交易ID
     def _hash(self) -> bytes:
-        return sha256(self.serialize()).digest()
+        return self.transaction.txid
+
+    def act(self, client: 'CLIENT') -> None:
+        try:
+            if client.mempool.add(self.transaction):
+                client.logger.info(f'Added a transaction {self.transaction._hash()} into the mempool')
+        except ValueError as e:
+            client.logger.warning(f'Rejected a transaction {self.transaction._hash()}: {e}')
+
+MSG.register(COMMAND_NAME_TX, Tx, Tx_)
 
 # 定义Notfound消息
 class Notfound(MSG):
@@ -1020,6 +1123,8 @@ class Notfound(MSG):
 # 定义Payload_Notfound消息
 Notfound_: TypeAlias = Inv_
 
+MSG.register(COMMAND_NAME_NOTFOUND, Notfound, Notfound_)
+
 # 定义Addr消息
 class Addr(MSG):
     def __init__(self,
@@ -1079,23 +1184,20 @@ class Addr_(PAYLOAD):
 
     @staticmethod
     def deserialize(data: bytes) -> 'Addr_':
-        IP_address_count, data = compactSize.deserialize(data)
+        data = memoryview(data)
+        payload, offset = Addr_.unpack_from(data)
+        return payload if offset == len(data) else (payload, data[offset:])
+
+    @staticmethod
+    def unpack_from(data: bytes | memoryview, offset: int = 0) -> tuple['Addr_', int]:
+        IP_address_count, offset = compactSize.unpack_from(data, offset)
         IP_addresses = []
-        for _ in range(IP_address_count - 1):
-            IP_address, data = NetworkIPAddress.deserialize(data)
-            IP_addresses.append(IP_address)
-        else:
-            IP_address = NetworkIPAddress.deserialize(data)
-            IP_address, data = IP_address if isinstance(IP_address, tuple) else (IP_address, b'')
+        for _ in range(IP_address_count):
+            IP_address, offset = NetworkIPAddress.unpack_from(data, offset)
             IP_addresses.append(IP_address)
         return Addr_(
             IP_addresses=IP_addresses
-        ) if not data else (
-            Addr_(
-                IP_addresses=IP_addresses
-            ),
-            data
-        )
+        ), offset
 
     def __len__(self) -> int:
         return len(self.serialize())
@@ -1109,6 +1211,8 @@ class Addr_(PAYLOAD):
     def _hash(self) -> bytes:
         return sha256(self.serialize()).digest()
 
+MSG.register(COMMAND_NAME_ADDR, Addr, Addr_)
+
 # 定义GetAddr消息
 class GetAddr(MSG):
     def __init__(self,
@@ -1156,6 +1260,8 @@ class GetAddr(MSG):
 # 定义Payload_GetAddr消息
 GetAddr_: TypeAlias = EMPTY_
 
+MSG.register(COMMAND_NAME_GETADDR, GetAddr, GetAddr_)
+
 # 定义Ping消息
 class Ping(MSG):
     def __init__(self,
@@ -1216,15 +1322,16 @@ class Ping_(PAYLOAD):
     
     @staticmethod
     def deserialize(data: bytes) -> 'Ping_':
-        nonce, data = NONCE_SERIALIZE.deserialize(data)
+        data = memoryview(data)
+        payload, offset = Ping_.unpack_from(data)
+        return payload if offset == len(data) else (payload, data[offset:])
+
+    @staticmethod
+    def unpack_from(data: bytes | memoryview, offset: int = 0) -> tuple['Ping_', int]:
+        nonce, offset = NONCE_SERIALIZE.unpack_from(data, offset)
         return Ping_(
             nonce=nonce
-        ) if not data else (
-            Ping_(
-                nonce=nonce
-            ),
-            data
-        )
+        ), offset
     
     def __len__(self) -> int:
         return len(self.serialize())
@@ -1235,6 +1342,8 @@ class Ping_(PAYLOAD):
     def _hash(self) -> bytes:
         return sha256(self.serialize()).digest()
 
+MSG.register(COMMAND_NAME_PING, Ping, Ping_)
+
 # 定义Pong消息
 class Pong(MSG):
     def __init__(self,
@@ -1287,6 +1396,8 @@ class Pong(MSG):
 # 定义Payload_Pong消息
 Pong_: TypeAlias = Ping_
 
+MSG.register(COMMAND_NAME_PONG, Pong, Pong_)
+
 # 定义SendHeaders消息
 class SendHeaders(MSG):
     def __init__(self,
@@ -1334,6 +1445,8 @@ class SendHeaders(MSG):
 # 定义Payload_SendHeaders消息
 SendHeaders_: TypeAlias = EMPTY_
 
+MSG.register(COMMAND_NAME_SENDHEADERS, SendHeaders, SendHeaders_)
+
 # 定义VerAck消息
 class VerAck(MSG):
     def __init__(self,
@@ -1381,6 +1494,8 @@ class VerAck(MSG):
 # 定义Payload_VerAck消息
 VerAck_: TypeAlias = EMPTY_
 
+MSG.register(COMMAND_NAME_VERACK, VerAck, VerAck_)
+
 # 定义Version消息
 class Version(MSG):
     def __init__(self,
@@ -1515,17 +1630,23 @@ class Version_(PAYLOAD):
     
     @staticmethod
     def deserialize(data: bytes) -> 'Version_':
-        version, data = VERSION_SERIALIZE.deserialize(data)
-        services, data = SERVICES_SERIALIZE.deserialize(data)
-        timestamp, data = TIMESTAMP_SERIALIZE.deserialize(data)
-        addr_recv_services, data = SERVICES_SERIALIZE.deserialize(data)
-        addr_recv_IP_address, data = IP_SERIALIZE.deserialize(data)
-        addr_recv_port, data = PORT_SERIALIZE.deserialize(data)
-        addr_trans_services, data = SERVICES_SERIALIZE.deserialize(data)
-        addr_trans_IP_address, data = IP_SERIALIZE.deserialize(data)
-        addr_trans_port, data = PORT_SERIALIZE.deserialize(data)
-        identifier, data = IDENTIFIER_SERIALIZE.deserialize(data)
-        start_height, data = START_HEIGHT_SERIALIZE.deserialize(data)
+        data = memoryview(data)
+        payload, offset = Version_.unpack_from(data)
+        return payload if offset == len(data) else (payload, data[offset:])
+
+    @staticmethod
+    def unpack_from(data: bytes | memoryview, offset: int = 0) -> tuple['Version_', int]:
+        version, offset = VERSION_SERIALIZE.unpack_from(data, offset)
+        services, offset = SERVICES_SERIALIZE.unpack_from(data, offset)
+        timestamp, offset = TIMESTAMP_SERIALIZE.unpack_from(data, offset)
+        addr_recv_services, offset = SERVICES_SERIALIZE.unpack_from(data, offset)
+        addr_recv_IP_address, offset = IP_SERIALIZE.unpack_from(data, offset)
+        addr_recv_port, offset = PORT_SERIALIZE.unpack_from(data, offset)
+        addr_trans_services, offset = SERVICES_SERIALIZE.unpack_from(data, offset)
+        addr_trans_IP_address, offset = IP_SERIALIZE.unpack_from(data, offset)
+        addr_trans_port, offset = PORT_SERIALIZE.unpack_from(data, offset)
+        identifier, offset = IDENTIFIER_SERIALIZE.unpack_from(data, offset)
+        start_height, offset = START_HEIGHT_SERIALIZE.unpack_from(data, offset)
         return Version_(
             version=version,
             services=services,
@@ -1538,21 +1659,7 @@ class Version_(PAYLOAD):
             addr_trans_port=addr_trans_port,
             identifier=identifier,
             start_height=start_height
-        ) if not data else (
-            Version_(
-                version=version,
-                services=services,
-                timestamp=timestamp,
-                addr_recv_services=addr_recv_services,
-                addr_recv_IP_address=addr_recv_IP_address,
-                addr_recv_port=addr_recv_port,
-                addr_trans_services=addr_trans_services,
-                addr_trans_IP_address=addr_trans_IP_address,
-                addr_trans_port=addr_trans_port,
-                identifier=identifier,
-                start_height=start_height
-            ), data
-        )
+        ), offset
 
     def __len__(self) -> int:
         return len(self.serialize())
@@ -1577,6 +1684,8 @@ class Version_(PAYLOAD):
             ,\n\t"addr_trans_services:<uint64_t>": {addr_trans_services},\n\t"addr_trans_IP_address:<char[16]>": {addr_trans_IP_address},\n\t"addr_trans_port:<uint16_t>": {addr_trans_port}\
             ,\n\t"conce:<uint64_t>": {idnetifier},\n\t"start_height:<uint32_t>": {start_height}\n}}'''
 
+MSG.register(COMMAND_NAME_VERSION, Version, Version_)
+
 
 if __name__ == "__main__":
     # 模块测试
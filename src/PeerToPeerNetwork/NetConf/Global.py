@@ -7,8 +7,7 @@
 
 import sys
 sys.path.append('.')
-from src.utils.data import SERIALIZE
-import struct
+from src.utils.data import SERIALIZE, unpack_bytes
 
 # 哈希（散列）序列化
 HASH_SERIALIZE = SERIALIZE('<32s')
@@ -25,6 +24,18 @@ PAYLOAD_SIZE_SERIALIZE = SERIALIZE('<I')
 CHECKSUM_SERIALIZE = SERIALIZE('<4s')
 # 消息报头序列化格式
 MESSAGE_HEADER_SERIALIZE = START_STRING_SERIALIZE + COMMAND_NAME_SERIALIZE + PAYLOAD_SIZE_SERIALIZE + CHECKSUM_SERIALIZE
+# 单条消息负载的最大长度
+MAX_PAYLOAD_SIZE = 32 * 1024 * 1024
+
+# 出站连接数上限
+MAX_OUTBOUND_CONNECTIONS = 125
+# 出站连接空闲超时（秒）
+CONNECTION_IDLE_TIMEOUT = 600
+# 建立连接超时（秒）
+CONNECT_TIMEOUT = 5
+# 连接失败后的重连等待（秒），每次失败加倍直至上限
+RECONNECT_BACKOFF = 1
+MAX_RECONNECT_BACKOFF = 300
 
 # 消息类型标识符序列化格式
 TYPE_IDENTIFIER_SERIALIZE = SERIALIZE('<I')
@@ -122,15 +133,58 @@ case_pong = COMMAND_NAME_SERIALIZE.serialize(COMMAND_NAME_PONG)
 case_sendheaders = COMMAND_NAME_SERIALIZE.serialize(COMMAND_NAME_SENDHEADERS)
 case_verack = COMMAND_NAME_SERIALIZE.serialize(COMMAND_NAME_VERACK)
 case_version = COMMAND_NAME_SERIALIZE.serialize(COMMAND_NAME_VERSION)
+
+# 消息处理优先级（数值越小越先处理）：控制 > 区块头 > 清单 > 交易/区块
+PRIORITY_CONTROL = 0
+PRIORITY_HEADERS = 1
+PRIORITY_INV = 2
+PRIORITY_BODY = 3
+COMMAND_PRIORITY = {
+    case_version: PRIORITY_CONTROL,
+    case_verack: PRIORITY_CONTROL,
+    case_ping: PRIORITY_CONTROL,
+    case_pong: PRIORITY_CONTROL,
+    case_addr: PRIORITY_CONTROL,
+    case_getaddr: PRIORITY_CONTROL,
+    case_sendheaders: PRIORITY_CONTROL,
+    case_getheaders: PRIORITY_HEADERS,
+    case_headers: PRIORITY_HEADERS,
+    case_inv: PRIORITY_INV,
+    case_getdata: PRIORITY_INV,
+    case_notfound: PRIORITY_INV,
+    case_getblocks: PRIORITY_INV,
+    case_mempool: PRIORITY_INV,
+    case_tx: PRIORITY_BODY,
+    case_block: PRIORITY_BODY,
+    case_merkleblock: PRIORITY_BODY,
+}
+# 消息队列容量，队列满时读取方等待
+MESSAGE_QUEUE_SIZE = 1024
+# 记录被拒绝消息计数的节点 IP 上限，超出时淘汰最久未出错的节点
+MAX_REJECTED_PEERS = 1024
     
 
-# FLAGS
-class FLAGS(int):
-    def __new__(cls, flags: int) -> 'FLAGS':
-        return super().__new__(cls, cls.normalize(flags))
+# 字节位反转表
+BIT_REVERSE_TABLE = bytes(sum(((i >> bit) & 1) << (7 - bit) for bit in range(8)) for i in range(256))
 
-    def __init__(self, flags: int) -> None:
-        self.reversed_flags = int(f'{int(self):<0{len(self) * 8}b}'[-1::-1], 2)
+# FLAGS
+# 位集合：第 i 个标志位（遍历顺序）存放于 data[i >> 3] 的第 (i & 7) 低位，与线上格式一致
+class FLAGS(object):
+    def __init__(self, flags: 'int | bytes | bytearray | memoryview | FLAGS') -> None:
+        if isinstance(flags, FLAGS):
+            self.data, self.bit_count = bytearray(flags.data), flags.bit_count
+        elif isinstance(flags, int):
+            # 兼容整数形式：自最高位的 1 起按高位在前为遍历顺序
+            if flags < 1:
+                raise ValueError('Invalid flags')
+            self.bit_count = flags.bit_length()
+            byte_count = (self.bit_count + 7) >> 3
+            self.data = bytearray(
+                (flags << (byte_count * 8 - self.bit_count)).to_bytes(byte_count, 'big').translate(BIT_REVERSE_TABLE)
+            )
+        else:
+            self.data = bytearray(flags)
+            self.bit_count = len(self.data) * 8
 
     def __bytes__(self) -> bytes:
         return self.serialize()
@@ -140,29 +194,53 @@ class FLAGS(int):
         return FLAGS.deserialize(data, flag_byte_count)
 
     def serialize(self) -> bytes:
-        return self.reversed_flags.to_bytes(len(self), 'big')
+        return bytes(self.data)
 
     @staticmethod
     def deserialize(data: bytes, flag_byte_count: int) -> 'FLAGS':
-        reversed_flags = int.from_bytes(data[:flag_byte_count], 'big')
-        flags, data = int(f'{reversed_flags:<0{flag_byte_count * 8}b}'[-1::-1], 2), data[flag_byte_count:]
-        return FLAGS(
-            flags
-        ) if not data else (
-            FLAGS(
-                flags
-            ), data
-        )
+        data = memoryview(data)
+        flags, offset = FLAGS.unpack_from(data, flag_byte_count)
+        return flags if offset == len(data) else (flags, data[offset:])
 
     @staticmethod
-    def normalize(flags: int) -> int:
-        if not flags:
-            raise ValueError('Invalid flags')
-        return flags if flags ^ 0 else FLAGS.normalize(flags >> 1)
+    def unpack_from(data: bytes | memoryview, flag_byte_count: int, offset: int = 0) -> tuple['FLAGS', int]:
+        flags, offset = unpack_bytes(data, flag_byte_count, offset)
+        return FLAGS(flags), offset
+
+    # 由遍历顺序的标志位构造
+    @staticmethod
+    def from_bits(bits: list[bool]) -> 'FLAGS':
+        flags = FLAGS(bytearray((len(bits) + 7) >> 3))
+        flags.bit_count = len(bits)
+        for i, bit in enumerate(bits):
+            if bit:
+                flags.data[i >> 3] |= 1 << (i & 7)
+        return flags
+
+    def __getitem__(self, i: int) -> bool:
+        if not 0 <= i < self.bit_count:
+            raise IndexError('Flag index out of range')
+        return bool(self.data[i >> 3] >> (i & 7) & 1)
+
+    # 按遍历顺序迭代标志位（由字节构造时含末字节的填充位）
+    def __iter__(self):
+        data = self.data
+        for i in range(self.bit_count):
+            yield bool(data[i >> 3] >> (i & 7) & 1)
 
+    def __int__(self) -> int:
+        return int.from_bytes(self.data.translate(BIT_REVERSE_TABLE), 'big') >> (len(self.data) * 8 - self.bit_count)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, FLAGS) and self.bit_count == other.bit_count and self.data == other.data
+
+    # 与 __eq__ 一致；修改 data 后哈希值随之改变，用作键时不应再修改
+    def __hash__(self) -> int:
+        return hash((bytes(self.data), self.bit_count))
+
+    # 字节数
     def __len__(self) -> int:
-        bit_count = int(self).bit_length()
-        return (bit_count // 8) + (bit_count % 8 != 0)
+        return len(self.data)
 
 # NetworkIPAddress
 class NetworkIPAddress(object):
@@ -185,16 +263,22 @@ class NetworkIPAddress(object):
     
     @staticmethod
     def deserialize(data: bytes) -> 'NetworkIPAddress':
-        time, data = TIME_SERIALIZE.deserialize(data)
-        services, data = SERVICES_SERIALIZE.deserialize(data)
-        IP_address, data = IP_SERIALIZE.deserialize(data)
-        port, data = PORT_SERIALIZE.deserialize(data)
+        data = memoryview(data)
+        IP_address, offset = NetworkIPAddress.unpack_from(data)
+        return IP_address, data[offset:]
+
+    @staticmethod
+    def unpack_from(data: bytes | memoryview, offset: int = 0) -> tuple['NetworkIPAddress', int]:
+        time, offset = TIME_SERIALIZE.unpack_from(data, offset)
+        services, offset = SERVICES_SERIALIZE.unpack_from(data, offset)
+        IP_address, offset = IP_SERIALIZE.unpack_from(data, offset)
+        port, offset = PORT_SERIALIZE.unpack_from(data, offset)
         return NetworkIPAddress(
             time=time,
             services=services,
             IP_address=IP_address,
             port=port
-        ), data
+        ), offset
     
     def __len__(self) -> int:
         return len(self.serialize())
@@ -218,27 +302,28 @@ class IP_SERIALIZE(SERIALIZE):
     _IPv4 = SERIALIZE('>BBBB')
 
     # 16字节的IPv6
-    IPv6 = str(NULL_ + _ONE_ + _IPv4)
+    IPv6 = NULL_ + _ONE_ + _IPv4
     
     @staticmethod
     def serialize(ipv4: str) -> bytes:
         ipv4 = IP_SERIALIZE.normalize(ipv4)
-        return struct.pack(
-            IP_SERIALIZE.IPv6,
+        return IP_SERIALIZE.IPv6.serialize(
             IP_SERIALIZE._one_,
             *map(int, ipv4.split('.'))
         )
 
     @staticmethod
     def deserialize(data: bytes) -> str:
-        _one_, *args = struct.unpack(
-            IP_SERIALIZE.IPv6,
-            data[:struct.calcsize(IP_SERIALIZE.IPv6)]
-        )
-        data = data[struct.calcsize(IP_SERIALIZE.IPv6):]
+        data = memoryview(data)
+        IP_address, offset = IP_SERIALIZE.unpack_from(data)
+        return IP_address, data[offset:]
+
+    @staticmethod
+    def unpack_from(data: bytes | memoryview, offset: int = 0) -> tuple[str, int]:
+        _one_, *args, offset = IP_SERIALIZE.IPv6.unpack_from(data, offset)
         if _one_ != IP_SERIALIZE._one_:
             raise ValueError('Invalid IP address')
-        return '.'.join(map(str, args)), data
+        return '.'.join(map(str, args)), offset
     
     @staticmethod
     def normalize(ip: str) -> str:
@@ -8,9 +8,160 @@
 import sys
 sys.path.append('.')
 import socket
-from asyncio import LifoQueue, run
+from typing import Any
+import asyncio
+from asyncio import run
+import heapq
+from itertools import count
+from collections import Counter, OrderedDict
+from time import monotonic
 import logging
 from src.PeerToPeerNetwork.Msg import MSG
+from src.PeerToPeerNetwork.NetConf.Global import *
+
+# 从连接中读取一条完整消息：先读固定长度的消息报头，再按负载大小读取负载；
+# StreamReader 不支持读入已有缓冲区，拼接报头时负载复制一次。返回不可变的 bytes，
+# 解码得到的对象保留的 memoryview 不会被改写；在消息边界处连接关闭时返回 None
+async def read_message(reader: asyncio.StreamReader) -> bytes | None:
+    try:
+        header = await reader.readexactly(len(MESSAGE_HEADER_SERIALIZE))
+    except asyncio.IncompleteReadError as e:
+        if not e.partial:
+            return None
+        raise
+    _, _, payload_size, _, _ = MESSAGE_HEADER_SERIALIZE.unpack_from(header)
+    if payload_size > MAX_PAYLOAD_SIZE:
+        raise ValueError('Payload is too large')
+    return header + await reader.readexactly(payload_size)
+
+# 消息队列
+# 有界优先队列：按命令名分级，同级先进先出；队列满时 put 等待，向读取方施加背压
+class MessageQueue(asyncio.Queue):
+    def __init__(self, maxsize: int = MESSAGE_QUEUE_SIZE) -> None:
+        super().__init__(maxsize)
+
+    def _init(self, maxsize: int) -> None:
+        self._queue: list[tuple[int, int, Any]] = []
+        self.sequence = count()
+        # 各优先级当前深度、累计入队数与历史最大总深度
+        self.depths = Counter()
+        self.received = Counter()
+        self.max_depth = 0
+
+    def _put(self, item: Any) -> None:
+        priority = self.priority_of(item)
+        heapq.heappush(self._queue, (priority, next(self.sequence), item))
+        self.depths[priority] += 1
+        self.received[priority] += 1
+        self.max_depth = max(self.max_depth, len(self._queue))
+
+    def _get(self) -> Any:
+        priority, _, item = heapq.heappop(self._queue)
+        self.depths[priority] -= 1
+        return item
+
+    # 由消息报头中的命令名确定优先级，item 为消息帧或 (消息帧, 地址)
+    @staticmethod
+    def priority_of(item: Any) -> int:
+        data = item[0] if isinstance(item, tuple) else item
+        start = len(START_STRING_SERIALIZE)
+        if not isinstance(data, (bytes, bytearray, memoryview)) or len(data) < start + COMMAND_NAME_LENGTH:
+            return PRIORITY_BODY
+        return COMMAND_PRIORITY.get(bytes(data[start:start + COMMAND_NAME_LENGTH]), PRIORITY_BODY)
+
+    def metrics(self) -> dict[str, Any]:
+        return {
+            'depth': self.qsize(),
+            'depths': dict(self.depths),
+            'received': dict(self.received),
+            'max_depth': self.max_depth,
+        }
+
+# 出站连接池
+# 以 (IP, 端口) 为键复用长连接，按最近使用排序；超过上限时关闭最久未用的连接，
+# 空闲超时的连接在下次发送时关闭，连接失败的节点按指数退避等待后才重新连接
+class ConnectionPool(object):
+    def __init__(self,
+        max_connections: int = MAX_OUTBOUND_CONNECTIONS,
+        idle_timeout: float = CONNECTION_IDLE_TIMEOUT,
+        connect_timeout: float = CONNECT_TIMEOUT
+    ) -> None:
+        self.max_connections = max_connections
+        self.idle_timeout = idle_timeout
+        self.connect_timeout = connect_timeout
+        # (IP, 端口) -> (读取流, 写入流, 最近使用时间)；读取流用于发现对端已关闭连接
+        self.connections: OrderedDict[tuple[str, int], tuple[asyncio.StreamReader, asyncio.StreamWriter, float]] = OrderedDict()
+        # (IP, 端口) -> (连续失败次数, 允许重连的时间)
+        self.failures: dict[tuple[str, int], tuple[int, float]] = {}
+
+    # 对端关闭连接后写入流不会进入关闭状态，需由读取流的 EOF 判断
+    @staticmethod
+    def closed(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> bool:
+        return writer.is_closing() or reader.at_eof()
+
+    async def connect(self, addr: tuple[str, int]) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        if addr in self.connections:
+            reader, writer, _ = self.connections[addr]
+            if not self.closed(reader, writer):
+                self.connections.move_to_end(addr)
+                return reader, writer
+            self.drop(addr)
+        count, retry_at = self.failures.get(addr, (0, 0))
+        if monotonic() < retry_at:
+            raise ConnectionError(f'Reconnecting to {addr} is backed off')
+        while len(self.connections) >= self.max_connections:
+            _, (_, writer, _) = self.connections.popitem(last=False)
+            writer.close()
+        try:
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(*addr), self.connect_timeout)
+        except (OSError, asyncio.TimeoutError) as e:
+            backoff = min(RECONNECT_BACKOFF * 2 ** count, MAX_RECONNECT_BACKOFF)
+            self.failures[addr] = (count + 1, monotonic() + backoff)
+            raise ConnectionError(f'Failed to connect to {addr}: {e}') from e
+        self.failures.pop(addr, None)
+        self.connections[addr] = (reader, writer, monotonic())
+        return reader, writer
+
+    # 发送一条消息，返回写出的字节数；复用的连接已被对端关闭时重新连接一次
+    # 消息对象与缓冲区列表按报头、负载分段写出，不拼接成一整段字节
+    async def send(self, addr: tuple[str, int], data: 'bytes | list[bytes | memoryview] | MSG') -> int:
+        if isinstance(data, MSG):
+            data = data.buffers()
+        buffers = data if isinstance(data, list) else [data]
+        self.reap()
+        for retry in (False, True):
+            reader, writer = await self.connect(addr)
+            try:
+                writer.writelines(buffers)
+                await writer.drain()
+            except ConnectionError:
+                self.drop(addr)
+                if retry:
+                    raise
+                continue
+            self.connections[addr] = (reader, writer, monotonic())
+            return sum(len(buffer) for buffer in buffers)
+
+    # 关闭空闲超时的连接
+    def reap(self) -> None:
+        now = monotonic()
+        while self.connections:
+            addr, (_, _, last_used) = next(iter(self.connections.items()))
+            if now - last_used < self.idle_timeout:
+                break
+            self.drop(addr)
+
+    def drop(self, addr: tuple[str, int]) -> None:
+        _, writer, _ = self.connections.pop(addr, (None, None, None))
+        if writer is not None:
+            writer.close()
+
+    def close(self) -> None:
+        while self.connections:
+            self.drop(next(iter(self.connections)))
+
+    def __len__(self) -> int:
+        return len(self.connections)
 
 # 定义Peer类
 class Peer(object):
@@ -19,7 +170,7 @@ class Peer(object):
         IP_address: str,
         port: int,
         listen: int,
-        sequence: LifoQueue
+        sequence: MessageQueue
     ) -> None:
         if not self.ready_listen(name=name, IP_address=IP_address, port=port, listen=listen):
             raise Exception('Failed to initialize the listener.')
@@ -46,57 +197,86 @@ class TransPeer(Peer):
         IP_address: str,
         port: int,
         listen: int,
-        mesSequence: LifoQueue,
-        actSequence: LifoQueue,
+        mesSequence: MessageQueue,
+        actSequence: MessageQueue,
     ) -> None:
         super().__init__(name=name, IP_address=IP_address, port=port, listen=listen, sequence=mesSequence)
         self.actSequence = actSequence
+        # 各节点 IP 被拒绝（格式或校验和错误）的消息帧计数；入站连接的端口是临时端口，不作区分
+        self.rejected: OrderedDict[str, int] = OrderedDict()
+        # 出站长连接
+        self.pool = ConnectionPool()
         # run(self.responce())
     
+    # 记录一次被拒绝的消息，返回该 IP 的累计次数；计数表按最近出错排序，超出上限时淘汰最旧的
+    def reject(self, addr: tuple[str, int]) -> int:
+        count = self.rejected.pop(addr[0], 0) + 1
+        self.rejected[addr[0]] = count
+        while len(self.rejected) > MAX_REJECTED_PEERS:
+            self.rejected.popitem(last=False)
+        return count
+
     async def responce(self):
         while True:
             data, addr = await self.sequence.get()
             self.logger.info(f'Received a {len(data)}.L.message from {addr}')
-            message = MSG.toMSG(data)
+            try:
+                message = MSG.toMSG(data)
+            except ValueError as e:
+                self.logger.warning(f'Rejected a {len(data)}.L.message from {addr}: {e} ({self.reject(addr)} rejected)')
+                self.sequence.task_done()
+                continue
             message, data = message if isinstance(message, tuple) else (message, b'')
             # 实现responce方法
             res = message.responce(addr)
             if isinstance(res, tuple):
-                self.skt.connect(res[0])
-                self.skt.sendall(res[1])
-                self.skt.close()
-                self.logger.info(f'Sent a {len(res[1])}.L.message. to {res[0]}')
+                try:
+                    size = await self.pool.send(res[0], res[1])
+                    self.logger.info(f'Sent a {size}.L.message. to {res[0]}')
+                except ConnectionError as e:
+                    self.logger.warning(f'Failed to send a message to {res[0]}: {e}')
             else:
-                self.actSequence.put_nowait(res)
+                await self.actSequence.put(res)
                 self.logger.info(f'Put a {len(res)}.L.message into the actSequence')
             self.sequence.task_done()
 
 
 
 # 定义RecvPeer类
-# 需要实现一个recv方法，接收数据并存入sequence
+# 基于 asyncio.start_server 接收连接，每个连接由独立的读取任务逐条读取消息并存入sequence
 class RecvPeer(Peer):
     def __init__(self,
         name: str,
         IP_address: str,
         port: int,
         listen: int,
-        mesSequence: LifoQueue
+        mesSequence: MessageQueue
     ) -> None:
         super().__init__(name=name, IP_address=IP_address, port=port, listen=listen, sequence=mesSequence)
+        # 各连接的读取任务
+        self.connections: set[asyncio.Task] = set()
         # run(self.recv())
-        
+
     async def recv(self):
-        while True:
-            conn, addr = self.skt.accept()
-            data = b''
-            self.logger.info(f'Received a connection from {addr}')
-            while _:=conn.recv(1024):
-                data += _
-            else:
-                self.sequence.put_nowait((data, addr))
-                conn.close()
+        self.skt.setblocking(False)
+        server = await asyncio.start_server(self.handle, sock=self.skt)
+        async with server:
+            await server.serve_forever()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        addr = writer.get_extra_info('peername')
+        task = asyncio.current_task()
+        self.connections.add(task)
+        self.logger.info(f'Received a connection from {addr}')
+        try:
+            while (data := await read_message(reader)) is not None:
+                await self.sequence.put((data, addr))
                 self.logger.info(f'Received a {len(data)}.L.message from {addr}')
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError) as e:
+            self.logger.warning(f'Closed the connection from {addr}: {e}')
+        finally:
+            self.connections.discard(task)
+            writer.close()
 
 # class Action(object):
 #     def __init__(self, data: bytes) -> None:
@@ -8,27 +8,39 @@
 import sys
 sys.path.append('.')
 import hashlib
-from src.utils.data import compactSize
+from functools import cached_property
+from src.utils.data import IMMUTABLE, compactSize
 from src.V.v1.CONFIG import *
 
+# ATM交易的空特定输出
+NULL_OUTPOINT = OUTPOINT_SERIALIZE.serialize(b'\x00' * len(HASH_SERIALIZE), INDEX_ON_ATM_DEFAULT)
+
 
 # 区块中第一笔交易为ATM交易
-class AuditMission(object):
+class AuditMission(IMMUTABLE):
     def __init__(self,
         height: int,
         ATM_script: bytes
     ) -> None:
         self.sequence = SEQUENCE_DEFAULT
-        self.ATM_script = ATM_script
+        self.ATM_script = bytes(ATM_script)
         self.height = compactSize(height)
         self.script_bytes = compactSize(len(self.ATM_script) + len(self.height))
         if self.script_bytes > MAX_ATM_SCRIPT_SIZE:
             raise ValueError('Invalid ATM_script')
         self.index = INDEX_ON_ATM_DEFAULT
         self.hash = '00' * len(HASH_SERIALIZE)
+        self._freeze()
     
     def serialize(self) -> bytes:
-        return (HASH_SERIALIZE + INDEX_SERIALIZE).serialize(
+        return self._serialized
+
+    # 序列化结果只计算一次
+    @cached_property
+    def _serialized(self) -> bytes:
+        if self._raw is not None:
+            return bytes(self._raw)
+        return OUTPOINT_SERIALIZE.serialize(
             bytes.fromhex(self.hash),
             self.index
         ) + self.script_bytes.serialize() \
@@ -38,33 +50,48 @@ class AuditMission(object):
     
     @staticmethod
     def deserialize(data: bytes) -> 'AuditMission':
-        hash, index, data = (HASH_SERIALIZE + INDEX_SERIALIZE).deserialize(data)
+        data = memoryview(data)
+        audit_mission, offset = AuditMission.unpack_from(data)
+        return audit_mission if offset == len(data) else (audit_mission, data[offset:])
+
+    # 从偏移处解码，返回ATM交易与新的偏移
+    @staticmethod
+    def unpack_from(data: bytes | memoryview, offset: int = 0) -> tuple['AuditMission', int]:
+        data, start = memoryview(data), offset
+        hash, index, offset = OUTPOINT_SERIALIZE.unpack_from(data, offset)
         if hash != b'\x00' * len(HASH_SERIALIZE):
             raise ValueError('Invalid data')
         if index != SEQUENCE_DEFAULT:
             raise ValueError('Invalid data')
-        script_bytes, data = compactSize.deserialize(data)
-        height, data = compactSize.deserialize(data)
-        ATM_script, sequence, data = SERIALIZE(f'<{script_bytes - len(height)}sI').deserialize(data)
+        script_bytes, offset = compactSize.unpack_from(data, offset)
+        height, offset = compactSize.unpack_from(data, offset)
+        ATM_script, sequence, offset = SERIALIZE(f'<{script_bytes - len(height)}sI').unpack_from(data, offset)
         if sequence != SEQUENCE_DEFAULT:
             raise ValueError('Invalid data')
-        return AuditMission(
+        audit_mission = AuditMission(
             height=int(height),
             ATM_script=ATM_script
-        ) if not data else (
-            AuditMission(
-                height=int(height),
-                ATM_script=ATM_script
-            ), data
         )
+        audit_mission._retain(data[start:offset])
+        return audit_mission, offset
+
+    # 判断偏移处是否为ATM交易（以空特定输出开头）
+    @staticmethod
+    def match(data: bytes | memoryview, offset: int = 0) -> bool:
+        return data[offset:offset + len(OUTPOINT_SERIALIZE)] == NULL_OUTPOINT
     
-    def _hash(self) -> str:
+    # 交易ID（原始32字节）
+    @cached_property
+    def txid(self) -> bytes:
         return hashlib.sha256(
-            self.serialize()
-        ).hexdigest()
+            self.raw()
+        ).digest()
+
+    def _hash(self) -> str:
+        return self.txid.hex()
 
     def __str__(self):
         return f'Audit-Mission: {{\n\t"hash:<char[32]>": {self.hash},\n\t"index:<uint32_t>": {self.index},\n\t"script_bytes:<compactSize uint>": {int(self.script_bytes)},\n\t"height:<Varies>": {int(self.height)},\n\t"ATM_script:<binary|script>": {self.ATM_script},\n\t"sequence:<uint32_t>": {self.sequence}\n}}'
 
     def __len__(self) -> int:
-        return len(self.serialize())
+        return len(self.raw())
@@ -0,0 +1,22 @@
+'''
+@File     : Global.py
+@Time     : 2025/01/09 09:31:46
+@Author   : H.SEON
+@Contact  : dsj34473@163.com
+'''
+
+'''
+交易池
+'''
+# 交易池中交易序列化数据的总字节数上限
+MAX_MEMPOOL_SIZE = 64 * 1024 * 1024
+# 交易在交易池中的最长停留时间（秒）
+MEMPOOL_EXPIRY = 14 * 24 * 60 * 60
+# 单条 inv 消息的最大条目数
+MAX_INV_COUNT = 50000
+
+'''
+脚本验证缓存
+'''
+# 缓存的验证通过记录数
+SCRIPT_CACHE_SIZE = 100000
@@ -0,0 +1,6 @@
+'''
+@File     : __init__.py
+@Time     : 2025/01/09 09:30:11
+@Author   : H.SEON
+@Contact  : dsj34473@163.com
+'''
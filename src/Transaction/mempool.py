@@ -0,0 +1,159 @@
+'''
+@File     : mempool.py
+@Time     : 2025/01/09 09:48:20
+@Author   : H.SEON
+@Contact  : dsj34473@163.com
+'''
+
+import sys
+sys.path.append('.')
+import heapq
+from time import time
+from itertools import count
+from src.Transaction.transaction import TRANSACTION, TxOut
+from src.BlockChain.validation import check_transaction
+from src.Transaction.CONF.Global import *
+
+# 交易池
+# 以交易ID为键；按被花费的特定输出建索引以 O(1) 检测冲突，字典顺序即到达顺序，
+# 按费率（手续费 / 字节数）维护小顶堆，超出容量时淘汰费率最低者（同费率先到先淘汰）及其后代
+class MemoryPool(object):
+    def __init__(self,
+        utxo: 'UTXOSet | None' = None,
+        max_size: int = MAX_MEMPOOL_SIZE,
+        scripts: 'ScriptCache | None' = None
+    ) -> None:
+        self.utxo = utxo
+        self.scripts = scripts
+        self.max_size = max_size
+        # 交易ID -> 交易，按到达顺序
+        self.txns: dict[bytes, TRANSACTION] = {}
+        # 交易ID -> (到达时间, 手续费, 到达序号)
+        self.entries: dict[bytes, tuple[float, int, int]] = {}
+        # 被花费的特定输出 -> 花费它的交易ID
+        self.spends: dict[tuple[bytes, int], bytes] = {}
+        # (费率, 到达序号, 交易ID)，移除的交易在出堆时跳过
+        self.heap: list[tuple[float, int, bytes]] = []
+        self.sequence = count()
+        self.size = 0
+
+    # 输入花费的输出：来自未花费输出集合或交易池中的父交易
+    def input_txout(self, key: tuple[bytes, int]) -> TxOut:
+        parent = self.txns.get(key[0])
+        if parent is not None:
+            if key[1] >= len(parent.tx_out):
+                raise ValueError('Missing inputs')
+            return parent.tx_out[key[1]]
+        txout = self.utxo.get(key) if self.utxo is not None else None
+        if txout is None:
+            raise ValueError('Missing inputs')
+        return txout
+
+    # 加入交易，返回是否为新交易；与池中交易冲突、输入缺失或超出容量时报错
+    def add(self, tx: TRANSACTION, fee: int | None = None) -> bool:
+        txid = tx.txid
+        if txid in self.txns:
+            return False
+        # 与区块验证相同的上下文无关检查，保证打包出的区块能通过验证
+        error = check_transaction(tx)
+        if error is not None:
+            raise ValueError(error)
+        keys = [(bytes.fromhex(tx_in.previous_output.hash), tx_in.previous_output.index) for tx_in in tx.tx_in]
+        if len(set(keys)) != len(keys) or any(key in self.spends for key in keys):
+            raise ValueError('Transaction conflicts with the mempool')
+        # 挂接未花费输出集合时总是解析输入；fee 只覆盖计算出的手续费
+        if self.utxo is not None:
+            txouts = [self.input_txout(key) for key in keys]
+            if self.scripts is not None:
+                self.scripts.verify_inputs(tx, txouts)
+            if fee is None:
+                fee = sum(txout.value for txout in txouts) - sum(tx_out.value for tx_out in tx.tx_out)
+        fee = 0 if fee is None else fee
+        if fee < 0:
+            raise ValueError('Outputs exceed inputs')
+        sequence = next(self.sequence)
+        self.txns[txid] = tx
+        self.entries[txid] = (time(), fee, sequence)
+        for key in keys:
+            self.spends[key] = txid
+        heapq.heappush(self.heap, (fee / len(tx), sequence, txid))
+        self.size += len(tx)
+        self.trim()
+        if txid not in self.txns:
+            raise ValueError('Mempool is full')
+        return True
+
+    # 移除交易及花费其输出的后代交易
+    def remove(self, txid: bytes) -> None:
+        stack = [txid]
+        while stack:
+            tx = self.txns.pop(stack.pop(), None)
+            if tx is None:
+                continue
+            del self.entries[tx.txid]
+            for tx_in in tx.tx_in:
+                self.spends.pop((bytes.fromhex(tx_in.previous_output.hash), tx_in.previous_output.index), None)
+            for index in range(len(tx.tx_out)):
+                child = self.spends.get((tx.txid, index))
+                if child is not None:
+                    stack.append(child)
+            self.size -= len(tx)
+
+    # 区块连接后移除已打包的交易，以及与其花费同一输出的冲突交易
+    def remove_block(self, block: 'BLOCK') -> None:
+        for txn in block.txns:
+            if not isinstance(txn, TRANSACTION):
+                continue
+            if txn.txid in self.txns:
+                self.remove(txn.txid)
+                continue
+            for tx_in in txn.tx_in:
+                spender = self.spends.get((bytes.fromhex(tx_in.previous_output.hash), tx_in.previous_output.index))
+                if spender is not None:
+                    self.remove(spender)
+
+    # 超出容量时按费率从低到高淘汰
+    def trim(self) -> None:
+        while self.size > self.max_size and self.heap:
+            _, sequence, txid = heapq.heappop(self.heap)
+            if txid in self.entries and self.entries[txid][2] == sequence:
+                self.remove(txid)
+        if len(self.heap) > 2 * len(self.txns) + 64:
+            self.heap = [item for item in self.heap if item[2] in self.entries and self.entries[item[2]][2] == item[1]]
+            heapq.heapify(self.heap)
+
+    # 移除到达时间早于 before 的交易，从最早到达者开始
+    def expire(self, before: float | None = None) -> int:
+        before = time() - MEMPOOL_EXPIRY if before is None else before
+        expired = []
+        for txid, (arrival, _, _) in self.entries.items():
+            if arrival >= before:
+                break
+            expired.append(txid)
+        for txid in expired:
+            self.remove(txid)
+        return len(expired)
+
+    # 应答 mempool 请求：按到达顺序分批生成 inv 消息，直接使用缓存的交易ID
+    def inv(self, start_string: bytes | int, max_count: int = MAX_INV_COUNT) -> list['Inv']:
+        from src.PeerToPeerNetwork.Msg import Inv, INVENTORY, MSG_TX
+        txids = list(self.txns)
+        return [
+            Inv(
+                start_string=start_string,
+                inventory=[INVENTORY(type_identifier=MSG_TX, hash=txid) for txid in txids[i:i + max_count]]
+            ) for i in range(0, len(txids), max_count)
+        ]
+
+    def get(self, txid: bytes) -> TRANSACTION | None:
+        return self.txns.get(txid)
+
+    # 特定输出被池中哪笔交易花费
+    def spender(self, key: tuple[bytes, int]) -> bytes | None:
+        return self.spends.get(key)
+
+    def __contains__(self, txid: bytes) -> bool:
+        return txid in self.txns
+
+    def __len__(self) -> int:
+        return len(self.txns)
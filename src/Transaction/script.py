@@ -0,0 +1,60 @@
+'''
+@File     : script.py
+@Time     : 2025/01/12 10:07:33
+@Author   : H.SEON
+@Contact  : dsj34473@163.com
+'''
+
+import sys
+sys.path.append('.')
+from hashlib import sha256
+from collections import OrderedDict
+from typing import Callable
+from src.Transaction.transaction import TRANSACTION, TxOut
+from src.Transaction.CONF.Global import *
+
+# 脚本验证函数：(交易, 输入索引, 被花费的输出) -> 是否通过
+ScriptVerifier = Callable[[TRANSACTION, int, TxOut], bool]
+
+# 脚本验证缓存
+# 以 (交易ID, 输入索引, 签名脚本与公钥脚本的哈希) 为键记录验证通过的输入，
+# 交易在进入交易池时验证过的脚本在区块验证时不再重复验证；验证函数可替换
+class ScriptCache(object):
+    def __init__(self,
+        verifier: ScriptVerifier | None = None,
+        max_size: int = SCRIPT_CACHE_SIZE
+    ) -> None:
+        self.verifier = verifier
+        self.max_size = max_size
+        self.entries: OrderedDict[tuple[bytes, int, bytes], None] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(tx: TRANSACTION, index: int, txout: TxOut) -> tuple[bytes, int, bytes]:
+        return tx.txid, index, sha256(tx.tx_in[index].signature_script + txout.pk_script).digest()
+
+    def verify(self, tx: TRANSACTION, index: int, txout: TxOut) -> bool:
+        if self.verifier is None:
+            return True
+        key = self.key(tx, index, txout)
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return True
+        self.misses += 1
+        if not self.verifier(tx, index, txout):
+            return False
+        self.entries[key] = None
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+        return True
+
+    # 验证交易的全部输入，txouts 为各输入花费的输出
+    def verify_inputs(self, tx: TRANSACTION, txouts: list[TxOut]) -> None:
+        for index, txout in enumerate(txouts):
+            if not self.verify(tx, index, txout):
+                raise ValueError(f'Script verification failed on input {index}')
+
+    def __len__(self) -> int:
+        return len(self.entries)
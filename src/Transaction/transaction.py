@@ -8,13 +8,14 @@
 import hashlib
 import sys
 sys.path.append('.')
+from functools import cached_property
 from typing import List
-from src.utils.data import compactSize
+from src.utils.data import IMMUTABLE, compactSize, unpack_bytes
 from src.V.v1.CONFIG import *
 from src.Transaction.ATM import AuditMission
 
 # 定义交易类
-class TRANSACTION(object):
+class TRANSACTION(IMMUTABLE):
     def __init__(self,
         tx_in: List['TxIn'],
         tx_out: List['TxOut'],
@@ -24,13 +25,21 @@ class TRANSACTION(object):
         self.lock_time = lock_time
         if self.lock_time < 0:
             raise ValueError('Invalid lock_time')
-        self.tx_out = tx_out
+        self.tx_out = tuple(tx_out)
         self.tx_out_count = compactSize(len(self.tx_out))
-        self.tx_in = tx_in
+        self.tx_in = tuple(tx_in)
         self.tx_in_count = compactSize(len(self.tx_in))
         self.version = version
+        self._freeze()
 
     def serialize(self) -> bytes:
+        return self._serialized
+
+    # 序列化结果只计算一次
+    @cached_property
+    def _serialized(self) -> bytes:
+        if self._raw is not None:
+            return bytes(self._raw)
         return VERSION_SERIALIZE.serialize(self.version) \
             + self.tx_in_count.serialize() \
             + b''.join([tx_in.serialize() for tx_in in self.tx_in]) \
@@ -40,31 +49,34 @@ class TRANSACTION(object):
     
     @staticmethod
     def deserialize(data: bytes) -> 'TRANSACTION':
-        version, data = VERSION_SERIALIZE.deserialize(data)
-        tx_in_count, data = compactSize.deserialize(data)
+        data = memoryview(data)
+        transaction, offset = TRANSACTION.unpack_from(data)
+        return transaction if offset == len(data) else (transaction, data[offset:])
+
+    # 从偏移处解码，返回交易与新的偏移（从 0 开始即为消耗的字节数）
+    @staticmethod
+    def unpack_from(data: bytes | memoryview, offset: int = 0) -> tuple['TRANSACTION', int]:
+        data, start = memoryview(data), offset
+        version, offset = VERSION_SERIALIZE.unpack_from(data, offset)
+        tx_in_count, offset = compactSize.unpack_from(data, offset)
         tx_in = []
         for _ in range(tx_in_count):
-            txin, data = TxIn.deserialize(data)
+            txin, offset = TxIn.unpack_from(data, offset)
             tx_in.append(txin)
-        tx_out_count, data = compactSize.deserialize(data)
+        tx_out_count, offset = compactSize.unpack_from(data, offset)
         tx_out = []
         for _ in range(tx_out_count):
-            txout, data = TxOut.deserialize(data)
+            txout, offset = TxOut.unpack_from(data, offset)
             tx_out.append(txout)
-        lock_time, data = LOCK_TIME_SERIALIZE.deserialize(data)
-        return TRANSACTION(
+        lock_time, offset = LOCK_TIME_SERIALIZE.unpack_from(data, offset)
+        transaction = TRANSACTION(
             version=version,
             tx_in=tx_in,
             tx_out=tx_out,
             lock_time=lock_time,
-        ) if not data else (
-            TRANSACTION(
-                version=version,
-                tx_in=tx_in,
-                tx_out=tx_out,
-                lock_time=lock_time,
-            ), data
         )
+        transaction._retain(data[start:offset])
+        return transaction, offset
     
     def __str__(self) -> str:
         string_tx_in = '[\n\t' + ',\n\t'.join([str(txin).replace('\n', '\n\t') for txin in self.tx_in]) + '\n]'
@@ -73,28 +85,43 @@ class TRANSACTION(object):
         string_tx_out = string_tx_out.replace("\n", "\n\t")
         return f'{{\n\t"version:<uint32_t>": {self.version},\n\t"tx_in_count:<compactSize uint>": {self.tx_in_count},\n\t"tx_in:<List[TxIn]>": {string_tx_in},\n\t"tx_out_count:<compactSize uint>": {self.tx_out_count},\n\t"tx_out:<List[TxOut]>": {string_tx_out},\n\t"lock_time:<uint32_t>": {self.lock_time}\n}}'
 
-    def _hash(self) -> str:
+    # 交易ID（原始32字节）
+    @cached_property
+    def txid(self) -> bytes:
         return hashlib.sha256(
-            self.serialize()
-        ).hexdigest()
+            self.raw()
+        ).digest()
+
+    def _hash(self) -> str:
+        return self.txid.hex()
+
+    # 序列化长度只计算一次
+    @cached_property
+    def _size(self) -> int:
+        return len(self.raw())
 
     def __len__(self) -> int:
-        return len(self.serialize())
+        return self._size
 
 # 定义交易输入类
-class TxIn(object):
+class TxIn(IMMUTABLE):
     def __init__(self,
         previous_output: 'outpoint',
         signature_script: bytes,
     ) -> None:
         self.sequence = SEQUENCE_DEFAULT
-        self.signature_script = signature_script
+        self.signature_script = bytes(signature_script)
         self.script_bytes = compactSize(len(signature_script))
         if self.script_bytes > MAX_SIGNATURE_SCRIPT_SIZE:
             raise ValueError('Invalid signature_script')
         self.previous_output = previous_output
+        self._freeze()
     
     def serialize(self) -> bytes:
+        return self._serialized
+
+    @cached_property
+    def _serialized(self) -> bytes:
         return self.previous_output.serialize() \
         + self.script_bytes.serialize() \
         + self.signature_script \
@@ -102,23 +129,23 @@ class TxIn(object):
     
     @staticmethod
     def deserialize(data: bytes) -> 'TxIn':
-        previous_output, data = outpoint.deserialize(data)
-        script_bytes, data = compactSize.deserialize(data)
-        signature_script, data = data[:script_bytes], data[script_bytes:]
-        if script_bytes != len(signature_script):
-            raise ValueError('Invalid data')
-        sequence, data = SEQUENCE_SERIALIZE.deserialize(data)
+        data = memoryview(data)
+        txin, offset = TxIn.unpack_from(data)
+        return txin if offset == len(data) else (txin, data[offset:])
+
+    # 从偏移处解码，返回交易输入与新的偏移
+    @staticmethod
+    def unpack_from(data: bytes | memoryview, offset: int = 0) -> tuple['TxIn', int]:
+        previous_output, offset = outpoint.unpack_from(data, offset)
+        script_bytes, offset = compactSize.unpack_from(data, offset)
+        signature_script, offset = unpack_bytes(data, script_bytes, offset)
+        sequence, offset = SEQUENCE_SERIALIZE.unpack_from(data, offset)
         if sequence != SEQUENCE_DEFAULT:
             raise ValueError('Invalid data')
         return TxIn(
             previous_output=previous_output,
             signature_script=signature_script,
-        ) if not data else (
-            TxIn(
-                previous_output=previous_output,
-                signature_script=signature_script
-            ), data
-        )
+        ), offset
     
     def __str__(self) -> str:
         string_previous_output = str(self.previous_output).replace('\n', '\n\t')
@@ -133,15 +160,20 @@ class TxIn(object):
         return len(self.serialize())
 
 # 定义特定输出类
-class outpoint(object):
+class outpoint(IMMUTABLE):
     def __init__(self,
         hash: str,
         index: int
     ) -> None:
         self.index = index
         self.hash = hash
+        self._freeze()
     
     def serialize(self) -> bytes:
+        return self._serialized
+
+    @cached_property
+    def _serialized(self) -> bytes:
         return OUTPOINT_SERIALIZE.serialize(
             bytes.fromhex(self.hash),
             self.index
@@ -149,16 +181,18 @@ class outpoint(object):
     
     @staticmethod
     def deserialize(data: bytes) -> 'outpoint':
-        hash, index, data = OUTPOINT_SERIALIZE.deserialize(data)
+        data = memoryview(data)
+        previous_output, offset = outpoint.unpack_from(data)
+        return previous_output if offset == len(data) else (previous_output, data[offset:])
+
+    # 从偏移处解码，返回特定输出与新的偏移
+    @staticmethod
+    def unpack_from(data: bytes | memoryview, offset: int = 0) -> tuple['outpoint', int]:
+        hash, index, offset = OUTPOINT_SERIALIZE.unpack_from(data, offset)
         return outpoint(
             hash=hash.hex(),
             index=index
-        ) if not data else (
-            outpoint(
-                hash=hash.hex(),
-                index=index
-            ), data
-        )
+        ), offset
     
     def __str__(self):
         return f'{{\n\t"hash:<char[32]>": {self.hash},\n\t"index:<uint32_t>": {self.index}\n}}'
@@ -172,39 +206,44 @@ class outpoint(object):
         return len(self.serialize())
 
 # 定义交易输出类
-class TxOut(object):
+class TxOut(IMMUTABLE):
     def __init__(self,
         value: int,
         pk_script: bytes
     ) -> None:
-        self.pk_script = pk_script
+        self.pk_script = bytes(pk_script)
         self.pk_script_bytes = compactSize(len(pk_script))
         if self.pk_script_bytes > MAX_PK_SCRIPT_SIZE:
             raise ValueError('Invalid pk_script')
         self.value = value
         if self.value < 0:
             raise ValueError('Invalid value')
+        self._freeze()
 
     def serialize(self) -> bytes:
+        return self._serialized
+
+    @cached_property
+    def _serialized(self) -> bytes:
         return VALUE_SERIALIZE.serialize(self.value) \
         + self.pk_script_bytes.serialize() + self.pk_script
     
     @staticmethod
     def deserialize(data: bytes) -> 'TxOut':
-        value, data = VALUE_SERIALIZE.deserialize(data)
-        pk_script_bytes, data = compactSize.deserialize(data)
-        pk_script, data = data[:pk_script_bytes], data[pk_script_bytes:]
-        if pk_script_bytes != len(pk_script):
-            raise ValueError('Invalid pk_script')
+        data = memoryview(data)
+        txout, offset = TxOut.unpack_from(data)
+        return txout if offset == len(data) else (txout, data[offset:])
+
+    # 从偏移处解码，返回交易输出与新的偏移
+    @staticmethod
+    def unpack_from(data: bytes | memoryview, offset: int = 0) -> tuple['TxOut', int]:
+        value, offset = VALUE_SERIALIZE.unpack_from(data, offset)
+        pk_script_bytes, offset = compactSize.unpack_from(data, offset)
+        pk_script, offset = unpack_bytes(data, pk_script_bytes, offset)
         return TxOut(
             value=value,
             pk_script=pk_script
-        ) if not data else (
-            TxOut(
-                value=value,
-                pk_script=pk_script
-            ), data
-        )
+        ), offset
     
     def __str__(self):
         return f'{{\n\t"value:<uint64_t>": {self.value},\n\t"pk_script_bytes:<compactSize>": {int(self.pk_script_bytes)},\n\t"pk_script:<binary|script>": {self.pk_script}\n}}'
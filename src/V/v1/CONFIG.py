@@ -25,6 +25,10 @@ MAX_ATM_SCRIPT_SIZE = 100
 MAX_PK_SCRIPT_SIZE = 10000
 # 签名最大长度
 MAX_SIGNATURE_SCRIPT_SIZE = 10000
+# 区块序列化数据最大长度
+MAX_BLOCK_SIZE = 1000000
+# 输出面值及单笔交易输出总额的最大值
+MAX_MONEY = 21000000 * 100000000
 
 
 '''
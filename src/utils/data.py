@@ -6,8 +6,17 @@
 '''
 
 import struct
+from functools import lru_cache
 from typing import Any
 
+# 动态格式（如按脚本长度拼出的格式）的编译缓存上限
+SERIALIZE_CACHE_SIZE = 256
+
+# compactSize 前缀后的定长整数
+_UINT16 = struct.Struct('<H')
+_UINT32 = struct.Struct('<I')
+_UINT64 = struct.Struct('<Q')
+
 # compactSize
 class compactSize(int):
     def __new__(cls, value: int) -> 'compactSize':
@@ -46,16 +55,24 @@ class compactSize(int):
 
     @staticmethod
     def from_bytes(data: bytes) -> tuple['compactSize', bytes]:
-        
-        if data[0] < 253:
-            return compactSize(data[0]), data[1:]
-        elif data[0] == 253:
-            return compactSize(int.from_bytes(data[1:3], 'little')), data[3:]
-        elif data[0] == 254:
-            return compactSize(int.from_bytes(data[1:5], 'little')), data[5:]
-        elif data[0] == 255:
-            return compactSize(int.from_bytes(data[1:9], 'little')), data[9:]
-        else:
+        data = memoryview(data)
+        value, offset = compactSize.unpack_from(data)
+        return value, data[offset:]
+
+    # 从偏移处读取，返回值与新的偏移，不复制数据
+    @staticmethod
+    def unpack_from(data: bytes | memoryview, offset: int = 0) -> tuple['compactSize', int]:
+        try:
+            prefix = data[offset]
+            if prefix < 253:
+                return compactSize(prefix), offset + 1
+            elif prefix == 253:
+                return compactSize(_UINT16.unpack_from(data, offset + 1)[0]), offset + 3
+            elif prefix == 254:
+                return compactSize(_UINT32.unpack_from(data, offset + 1)[0]), offset + 5
+            else:
+                return compactSize(_UINT64.unpack_from(data, offset + 1)[0]), offset + 9
+        except (IndexError, struct.error):
             raise ValueError('Invalid compactSize value')
     
     @staticmethod
@@ -80,10 +97,22 @@ class SERIALIZE(str):
     char = ('x', 'c', 'b', 'B', '?', 'h', 'H', 'i', 'I', 'l', 'L', 'q', 'Q', 'n', 'N', 'e', 'f', 'd', 's', 'p', 'P')
     
     def __new__(cls, format: str) -> 'SERIALIZE':
-        return str.__new__(cls, cls.normalize(format))
+        self = str.__new__(cls, cls.normalize(format))
+        self.compiled = SERIALIZE.compile(str(self))
+        self.size = self.compiled.size
+        return self
     
     def __len__(self) -> int:
-        return struct.calcsize(str(self))
+        return self.size
+
+    def __reduce__(self):
+        return SERIALIZE, (str(self),)
+
+    # 同一格式只编译一次
+    @staticmethod
+    @lru_cache(maxsize=SERIALIZE_CACHE_SIZE)
+    def compile(format: str) -> struct.Struct:
+        return struct.Struct(format)
     
     @staticmethod
     def normalize(format: str) -> str:
@@ -97,13 +126,63 @@ class SERIALIZE(str):
         return SERIALIZE(str(self) + SERIALIZE.normalize(other)[1:])
 
     def serialize(self, *args) -> bytes:
-        return struct.pack(
-            str(self),
-            *args
-        )
+        return self.compiled.pack(*args)
     
     def deserialize(self, data: bytes) -> Any:
-        return *struct.unpack(
-            str(self),
-            data[:len(self)]
-        ), data[len(self):]
+        data = memoryview(data)
+        *values, offset = self.unpack_from(data)
+        return *values, data[offset:]
+
+    # 从偏移处读取，返回各字段与新的偏移，不复制数据
+    def unpack_from(self, data: bytes | memoryview, offset: int = 0) -> Any:
+        try:
+            return *self.compiled.unpack_from(data, offset), offset + self.size
+        except struct.error:
+            raise ValueError('Invalid data')
+
+
+# 从偏移处读取定长字节串，返回字节串与新的偏移
+def unpack_bytes(data: bytes | memoryview, length: int, offset: int = 0) -> tuple[bytes, int]:
+    end = offset + int(length)
+    if end > len(data):
+        raise ValueError('Invalid data')
+    return bytes(data[offset:end]), end
+
+
+# 不可变值对象
+# 构造结束时调用 _freeze，此后属性不可修改，序列化结果、哈希等可以放心缓存
+class IMMUTABLE(object):
+    _frozen = False
+    _raw = None
+
+    def _freeze(self) -> None:
+        object.__setattr__(self, '_frozen', True)
+
+    # 保留解码时的原始线上字节片段（memoryview，不复制）
+    # 注意：片段会使整个接收缓冲区保持存活
+    def _retain(self, raw: memoryview) -> None:
+        object.__setattr__(self, '_raw', raw)
+
+    # 原始线上字节：解码得到的对象直接返回保留的片段，否则返回序列化结果
+    def raw(self) -> bytes | memoryview:
+        return self._raw if self._raw is not None else self.serialize()
+
+    # 将原始线上字节追加到调用方提供的缓冲区，返回写入的字节数
+    def serialize_into(self, buffer: bytearray) -> int:
+        raw = self.raw()
+        buffer += raw
+        return len(raw)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if self._frozen:
+            raise AttributeError(f'{type(self).__name__} is immutable')
+        object.__setattr__(self, name, value)
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    def __eq__(self, other: Any) -> bool:
+        return type(self) is type(other) and self.serialize() == other.serialize()
+
+    def __hash__(self) -> int:
+        return hash(self.serialize())
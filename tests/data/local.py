@@ -9,8 +9,11 @@ import sys
 sys.path.append('.')
 from src.Transaction.transaction import *
 from src.BlockChain.block import *
+from src.BlockChain.utxo import UTXOSet
 from time import time
 from random import randint
+import unittest
+import tempfile
 import hashlib
 
 def json_output():
@@ -60,7 +63,7 @@ def json_merkle_block():
     block_header.merkle_root_hash = atm._hash()
     return {
         'block_header': block_header,
-        'txns': [atm, ] + [TRANSACTION(**json_transaction()) for _ in range(int(time()) % 4)],
+        'txns': [atm, ] + [TRANSACTION(**{**json_transaction(), 'lock_time': i}) for i in range(1, int(time()) % 4 + 1)],
     }
 
 def json_ATM():
@@ -69,6 +72,57 @@ def json_ATM():
         'ATM_script': hashlib.sha256(hex(int(time()) // 11).encode()).digest(),
     }
 
+# 前后相连的区块链，每个区块含一笔随机交易
+def json_chain(length: int) -> list[BLOCK]:
+    blocks = []
+    previous_block_header_hash = '00' * 32
+    for _ in range(length):
+        block_header = BlockHeader(**json_block_header())
+        block_header.previous_block_header_hash = previous_block_header_hash
+        blocks.append(BLOCK(block_header, [TRANSACTION(**json_transaction())]))
+        previous_block_header_hash = block_header._hash()
+    return blocks
+
+# 两个区块：第一个创建 funding 的两个输出，第二个花费其中第一个
+def spending_chain() -> list[BLOCK]:
+    funding = TRANSACTION(tx_in=[], tx_out=[TxOut(50, b'\x01'), TxOut(20, b'\x02')], lock_time=0)
+    spending = TRANSACTION(
+        tx_in=[TxIn(outpoint(funding.txid.hex(), 0), b'\x03')],
+        tx_out=[TxOut(45, b'\x04')],
+        lock_time=0
+    )
+    return [
+        BLOCK(BlockHeader(**json_block_header()), [AuditMission(**json_ATM()), funding]),
+        BLOCK(BlockHeader(**json_block_header()), [AuditMission(**json_ATM()), spending]),
+    ]
+
+# 花费 tx 的第 index 个输出，产生一个面值为 value 的输出
+def spend(tx: TRANSACTION, index: int, value: int, script: bytes = b'\x05') -> TRANSACTION:
+    return TRANSACTION(
+        tx_in=[TxIn(outpoint(tx.txid.hex(), index), script)],
+        tx_out=[TxOut(value, b'\x06')],
+        lock_time=0
+    )
+
+# 默克尔根与交易一致的区块
+def merkle_block(txns: list[TRANSACTION]) -> BLOCK:
+    block_header = BlockHeader(**json_block_header())
+    block_header.merkle_root_hash = MerkleTree.root_of([txn.txid for txn in txns]).hex()
+    return BLOCK(block_header, txns)
+
+# 已连接 spending_chain 第一个区块的未花费输出集合，self.funding 为其中可花费的交易
+class UTXOTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.TemporaryDirectory()
+        self.blocks = spending_chain()
+        self.funding = self.blocks[0].txns[1]
+        self.utxo = UTXOSet(self.path.name)
+        self.utxo.connect_block(self.blocks[0], 0)
+
+    def tearDown(self):
+        self.utxo.close()
+        self.path.cleanup()
 
 if __name__ == '__main__':
     # print(outpoint(**json_output()))
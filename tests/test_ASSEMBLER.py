@@ -0,0 +1,46 @@
+'''
+@File     : test_ASSEMBLER.py
+@Time     : 2025/01/10 11:02:44
+@Author   : H.SEON
+@Contact  : dsj34473@163.com
+'''
+
+import sys
+sys.path.append('.')
+import unittest
+from src.BlockChain.assembler import BlockAssembler
+from src.Transaction.mempool import MemoryPool
+from tests.data.local import *
+
+class TestBlockAssembler(UTXOTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.mempool = MemoryPool(utxo=self.utxo)
+        self.parent = spend(self.funding, 0, 49)
+        self.child = spend(self.parent, 0, 30)
+        self.other = spend(self.funding, 1, 15)
+        for tx in (self.parent, self.child, self.other):
+            self.mempool.add(tx)
+
+    def test_assemble(self):
+        previous_block_header_hash = bytes.fromhex(self.blocks[0].block_header._hash())
+        block = BlockAssembler(self.mempool).assemble(previous_block_header_hash, 1, b'\x09')
+        self.assertIsInstance(block.txns[0], AuditMission)
+        self.assertEqual([txn.txid for txn in block.txns[1:]], [self.other.txid, self.parent.txid, self.child.txid])
+        self.assertEqual(block.block_header.previous_block_header_hash, previous_block_header_hash.hex())
+        self.assertEqual(
+            block.block_header.merkle_root_hash, MerkleTree.root_of([txn.txid for txn in block.txns]).hex()
+        )
+        self.assertEqual(BLOCK.deserialize(block.serialize()).serialize(), block.serialize())
+        self.assertEqual(self.utxo.connect_block(block, 1)[0][1], self.funding.tx_out[1])
+
+    def test_assemble_max_block_size(self):
+        empty = BlockAssembler(self.mempool, max_block_size=0).assemble(None, 1, b'\x09')
+        max_block_size = len(empty) + 8 + len(self.other) + len(self.parent)
+        block = BlockAssembler(self.mempool, max_block_size=max_block_size).assemble(None, 1, b'\x09')
+        self.assertEqual([txn.txid for txn in block.txns[1:]], [self.other.txid, self.parent.txid])
+        self.assertLessEqual(len(block), max_block_size)
+
+if __name__ == '__main__':
+    unittest.main()
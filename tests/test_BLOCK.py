@@ -8,7 +8,8 @@
 import sys
 sys.path.append('.')
 import unittest
-from src.BlockChain.block import BLOCK, BlockHeader
+from concurrent.futures import ThreadPoolExecutor
+from src.BlockChain.block import BLOCK, BlockHeader, MerkleTree
 from src.Transaction.transaction import TRANSACTION
 from tests.data.local import *
 
@@ -34,5 +35,45 @@ class TestBlock(unittest.TestCase):
         self.assertIsInstance(deserialized_block, BLOCK)
         self.assertEqual(deserialized_block.serialize(), self.block.serialize())
 
+    def test_block_unpack_from(self):
+        serialized_block = self.block.serialize()
+        block, consumed = BLOCK.unpack_from(serialized_block + b'\x00' * 3)
+        self.assertEqual(consumed, len(serialized_block))
+        self.assertEqual(block.serialize(), serialized_block)
+
+    def test_block_deserialization_with_ATM(self):
+        block = BLOCK(self.block_header, [AuditMission(**json_ATM())] + self.transactions)
+        deserialized_block = BLOCK.deserialize(block.serialize())
+        self.assertIsInstance(deserialized_block.txns[0], AuditMission)
+        self.assertEqual(deserialized_block.serialize(), block.serialize())
+
+    def test_empty_block_deserialization(self):
+        block = BLOCK(self.block_header, [])
+        deserialized_block = BLOCK.deserialize(block.serialize())
+        self.assertEqual(deserialized_block.txn_count, 0)
+
+    def test_merkle_tree_root(self):
+        txns = [AuditMission(**json_ATM())] + [TRANSACTION(**{**json_transaction(), 'lock_time': i}) for i in range(16)]
+        merkle_tree = MerkleTree(txns[:1])
+        for count in range(1, len(txns) + 1):
+            merkle_tree.update(txns[count - 1])
+            level = [txn.txid for txn in txns[:count]]
+            while len(level) > 1:
+                level += level[-1:] * (len(level) % 2)
+                level = [MerkleTree.pair_hash(*level[i:i + 2]) for i in range(0, len(level), 2)]
+            self.assertEqual(len(merkle_tree), count)
+            self.assertEqual(merkle_tree.root_digest(), level[0])
+        merkle_tree.update(txns[3])
+        self.assertEqual(len(merkle_tree), len(txns))
+
+    def test_merkle_root_of(self):
+        txns = [AuditMission(**json_ATM())] + [TRANSACTION(**{**json_transaction(), 'lock_time': i}) for i in range(22)]
+        merkle_tree = MerkleTree(txns)
+        txids = [txn.txid for txn in txns]
+        self.assertEqual(MerkleTree.root_of(txids), merkle_tree.root_digest())
+        self.assertEqual(MerkleTree.root_of(txids[:1]), txids[0])
+        with ThreadPoolExecutor(2) as executor:
+            self.assertEqual(MerkleTree.root_of(txids, executor, chunk_size=3), merkle_tree.root_digest())
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
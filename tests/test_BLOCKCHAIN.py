@@ -0,0 +1,131 @@
+'''
+@File     : test_BLOCKCHAIN.py
+@Time     : 2025/01/05 15:02:18
+@Author   : H.SEON
+@Contact  : dsj34473@163.com
+'''
+
+import sys
+sys.path.append('.')
+import os
+import unittest
+import tempfile
+from src.BlockChain.blockChain import BlockChain
+from tests.data.local import *
+
+class TestBlockChain(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.TemporaryDirectory()
+        self.blocks = json_chain(5)
+
+    def tearDown(self):
+        self.path.cleanup()
+
+    def test_add_block(self):
+        with BlockChain(self.path.name) as blockchain:
+            for height, block in enumerate(self.blocks):
+                self.assertEqual(blockchain.add_block(block), height)
+            self.assertEqual(len(blockchain), len(self.blocks))
+            self.assertEqual(blockchain.add_block(self.blocks[2]), 2)
+            self.assertEqual(blockchain.read_block(3), self.blocks[3].serialize())
+            self.assertEqual(blockchain.read_block(self.blocks[1].block_header._hash()), self.blocks[1].serialize())
+
+    def test_reject_unlinked_block(self):
+        with BlockChain(self.path.name) as blockchain:
+            blockchain.add_block(self.blocks[0])
+            with self.assertRaises(ValueError):
+                blockchain.add_block(self.blocks[2])
+
+    def test_reopen(self):
+        with BlockChain(self.path.name, max_file_size=1) as blockchain:
+            for block in self.blocks[:3]:
+                blockchain.add_block(block)
+        with BlockChain(self.path.name, max_file_size=1) as blockchain:
+            self.assertEqual(len(blockchain), 3)
+            self.assertEqual(blockchain.tip(), bytes.fromhex(self.blocks[2].block_header._hash()))
+            for block in self.blocks[3:]:
+                blockchain.add_block(block)
+            self.assertEqual(blockchain.locate(4)[0], 4)
+            self.assertEqual(blockchain.get_block(4).serialize(), self.blocks[4].serialize())
+
+    def test_torn_index_record(self):
+        with BlockChain(self.path.name) as blockchain:
+            for block in self.blocks[:3]:
+                blockchain.add_block(block)
+        with open(os.path.join(self.path.name, INDEX_FILE_NAME), 'ab') as f:
+            f.write(b'\x00' * (len(INDEX_RECORD_SERIALIZE) // 2))
+        with BlockChain(self.path.name) as blockchain:
+            self.assertEqual(len(blockchain), 3)
+            for block in self.blocks[3:]:
+                blockchain.add_block(block)
+        with BlockChain(self.path.name) as blockchain:
+            self.assertEqual(len(blockchain), len(self.blocks))
+            self.assertEqual(blockchain.read_block(-1), self.blocks[-1].serialize())
+
+    def test_reopen_after_torn_block_write(self):
+        with BlockChain(self.path.name, max_file_size=300) as blockchain:
+            for block in self.blocks[:3]:
+                blockchain.add_block(block)
+            file_number = blockchain.file_number
+        # 区块已写入而索引未写入：当前文件末尾与下一个区块文件中留有未索引的数据
+        for number in (file_number, file_number + 1):
+            with open(os.path.join(self.path.name, BLOCK_FILE_NAME.format(number)), 'ab') as f:
+                f.write(self.blocks[4].serialize())
+        with BlockChain(self.path.name, max_file_size=300) as blockchain:
+            for block in self.blocks[3:]:
+                blockchain.add_block(block)
+            self.assertGreater(blockchain.file_number, file_number)
+        with BlockChain(self.path.name, max_file_size=300) as blockchain:
+            for height, block in enumerate(self.blocks):
+                self.assertEqual(blockchain.read_block(height), block.serialize())
+
+    def test_pop_block_across_files(self):
+        fork, previous_block_header_hash = [], self.blocks[1].block_header._hash()
+        for lock_time in range(100, 103):
+            block_header = BlockHeader(**json_block_header())
+            block_header.previous_block_header_hash = previous_block_header_hash
+            fork.append(BLOCK(block_header, [TRANSACTION(**{**json_transaction(), 'lock_time': lock_time})]))
+            previous_block_header_hash = block_header._hash()
+        with BlockChain(self.path.name, max_file_size=300) as blockchain:
+            for block in self.blocks[:4]:
+                blockchain.add_block(block)
+            blockchain.pop_block()
+            blockchain.pop_block()
+            file_number, offset, length = blockchain.locate(-1)
+            self.assertEqual(blockchain.file_number, file_number)
+            self.assertEqual(blockchain.size_of(file_number), offset + length)
+            self.assertEqual(blockchain.size_of(file_number + 1), 0)
+            blockchain.add_block(fork[0])
+        with BlockChain(self.path.name, max_file_size=300) as blockchain:
+            for block in fork[1:]:
+                blockchain.add_block(block)
+            chain = self.blocks[:2] + fork
+            for height, block in enumerate(chain):
+                self.assertEqual(blockchain.read_block(height), block.serialize())
+        with BlockChain(self.path.name, max_file_size=300) as blockchain:
+            for height, block in enumerate(chain):
+                self.assertEqual(blockchain.get_block(height).serialize(), block.serialize())
+
+    def test_view_block(self):
+        with BlockChain(self.path.name) as blockchain:
+            for block in self.blocks:
+                blockchain.add_block(block)
+                view = blockchain.view_block(block.block_header._hash())
+                self.assertIsInstance(view, memoryview)
+                self.assertEqual(view, block.serialize())
+                view.release()
+
+    def test_pop_block(self):
+        with BlockChain(self.path.name) as blockchain:
+            for block in self.blocks:
+                blockchain.add_block(block)
+            self.assertEqual(blockchain.pop_block().serialize(), self.blocks[-1].serialize())
+            self.assertNotIn(self.blocks[-1].block_header._hash(), blockchain)
+        with BlockChain(self.path.name) as blockchain:
+            self.assertEqual(len(blockchain), len(self.blocks) - 1)
+            self.assertEqual(blockchain.add_block(self.blocks[-1]), len(self.blocks) - 1)
+            self.assertEqual(blockchain.read_block(-1), self.blocks[-1].serialize())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+'''
+@File     : test_FLAGS.py
+@Time     : 2025/01/07 16:25:31
+@Author   : H.SEON
+@Contact  : dsj34473@163.com
+'''
+
+import sys
+sys.path.append('.')
+import unittest
+from src.PeerToPeerNetwork.NetConf.Global import FLAGS
+
+class TestFLAGS(unittest.TestCase):
+
+    def setUp(self):
+        self.bits = [True, False, True, True, False, False, False, False, False, True, True]
+
+    def test_flags_from_bits(self):
+        flags = FLAGS.from_bits(self.bits)
+        self.assertEqual(list(flags), self.bits)
+        self.assertEqual(flags.serialize(), bytes([0b00001101, 0b00000110]))
+        self.assertEqual(len(flags), 2)
+        self.assertIs(flags[9], True)
+        with self.assertRaises(IndexError):
+            flags[len(self.bits)]
+
+    def test_flags_int_compatibility(self):
+        value = int(''.join('1' if bit else '0' for bit in self.bits), 2)
+        self.assertEqual(FLAGS(value), FLAGS.from_bits(self.bits))
+        self.assertEqual(int(FLAGS(value)), value)
+        with self.assertRaises(ValueError):
+            FLAGS(0)
+
+    def test_flags_hash(self):
+        flags = FLAGS.from_bits(self.bits)
+        self.assertEqual(hash(flags), hash(FLAGS(flags)))
+        self.assertEqual(len({flags, FLAGS(flags), FLAGS(flags.serialize())}), 2)
+
+    def test_flags_deserialization(self):
+        flags = FLAGS.from_bits(self.bits)
+        deserialized_flags, rest = FLAGS.deserialize(flags.serialize() + b'\x01', len(flags))
+        self.assertEqual(deserialized_flags.serialize(), flags.serialize())
+        # 由字节构造时含末字节的填充位，位数不同即不相等
+        self.assertNotEqual(deserialized_flags, flags)
+        self.assertEqual(deserialized_flags, FLAGS(flags.serialize()))
+        self.assertEqual(list(deserialized_flags)[:len(self.bits)], self.bits)
+        self.assertEqual(bytes(rest), b'\x01')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+'''
+@File     : test_HEADERCHAIN.py
+@Time     : 2025/01/06 11:20:43
+@Author   : H.SEON
+@Contact  : dsj34473@163.com
+'''
+
+import sys
+sys.path.append('.')
+import unittest
+import tempfile
+from src.BlockChain.blockChain import BlockChain
+from src.BlockChain.headerChain import HeaderChain
+from tests.data.local import *
+
+class TestHeaderChain(unittest.TestCase):
+
+    def setUp(self):
+        self.blocks = json_chain(40)
+        self.header_chain = HeaderChain()
+        for block in self.blocks:
+            self.header_chain.add_header(block.block_header)
+
+    def test_add_header(self):
+        self.assertEqual(len(self.header_chain), len(self.blocks))
+        self.assertEqual(self.header_chain.add_header(self.blocks[3].block_header), 3)
+        self.assertEqual(bytes(self.header_chain.header(7)), self.blocks[7].block_header.serialize())
+        with self.assertRaises(ValueError):
+            self.header_chain.add_header(BlockHeader(**json_block_header()))
+
+    def test_add_header_while_headers_held(self):
+        header_chain = HeaderChain()
+        for block in self.blocks[:20]:
+            header_chain.add_header(block.block_header)
+        header = header_chain.header(3)
+        headers = header_chain.headers_after([])
+        for block in self.blocks[20:]:
+            header_chain.add_header(block.block_header)
+        self.assertEqual(header, self.blocks[3].block_header.serialize())
+        self.assertEqual(len(headers), 20 * len(BLOCK_HEADER_SERIALIZE))
+        self.assertEqual(len(header_chain), len(self.blocks))
+
+    def test_locator(self):
+        locator = self.header_chain.locator()
+        heights = [self.header_chain.heights[hash] for hash in locator]
+        self.assertEqual(heights[:10], list(range(39, 29, -1)))
+        self.assertEqual(heights[10:], [28, 24, 16, 0])
+
+    def test_get_headers(self):
+        peer = HeaderChain()
+        for block in self.blocks[:25]:
+            peer.add_header(block.block_header)
+        headers = self.header_chain.get_headers(peer.locator())
+        self.assertEqual([header.serialize() for header in headers], [block.block_header.serialize() for block in self.blocks[25:]])
+        headers = self.header_chain.get_headers(peer.locator(), count=5)
+        self.assertEqual(len(headers), 5)
+        stop_hash = bytes.fromhex(self.blocks[27].block_header._hash())
+        headers = self.header_chain.get_headers(peer.locator(), stop_hash)
+        self.assertEqual([header.serialize() for header in headers], [block.block_header.serialize() for block in self.blocks[25:28]])
+        self.assertEqual(len(self.header_chain.get_headers(self.header_chain.locator())), 0)
+
+    def test_from_blockchain(self):
+        with tempfile.TemporaryDirectory() as path, BlockChain(path) as blockchain:
+            for block in self.blocks[:5]:
+                blockchain.add_block(block)
+            header_chain = HeaderChain.from_blockchain(blockchain)
+            self.assertEqual(header_chain.hashes, self.header_chain.hashes[:5])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+'''
+@File     : test_MEMPOOL.py
+@Time     : 2025/01/09 14:05:37
+@Author   : H.SEON
+@Contact  : dsj34473@163.com
+'''
+
+import sys
+sys.path.append('.')
+import unittest
+from src.Transaction.mempool import MemoryPool
+from src.PeerToPeerNetwork.Msg import MSG, Inv
+from src.PeerToPeerNetwork.NetConf.LocalNet import START_STRING
+from tests.data.local import *
+
+class TestMemoryPool(UTXOTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.mempool = MemoryPool(utxo=self.utxo)
+
+    def test_add_and_conflict(self):
+        tx = spend(self.funding, 0, 40)
+        self.assertIs(self.mempool.add(tx), True)
+        self.assertIs(self.mempool.add(tx), False)
+        self.assertEqual(self.mempool.entries[tx.txid][1], 10)
+        self.assertEqual(self.mempool.spender((self.funding.txid, 0)), tx.txid)
+        with self.assertRaises(ValueError):
+            self.mempool.add(spend(self.funding, 0, 30, b'\x07'))
+        with self.assertRaises(ValueError):
+            self.mempool.add(spend(self.funding, 1, 30))
+        with self.assertRaises(ValueError):
+            self.mempool.add(spend(tx, 5, 1))
+        with self.assertRaisesRegex(ValueError, 'no outputs'):
+            self.mempool.add(TRANSACTION(tx_in=[TxIn(outpoint(self.funding.txid.hex(), 1), b'\x05')], tx_out=[], lock_time=0))
+        with self.assertRaisesRegex(ValueError, 'no inputs'):
+            self.mempool.add(TRANSACTION(tx_in=[], tx_out=[TxOut(1, b'\x06')], lock_time=0))
+        child = spend(tx, 0, 35)
+        self.mempool.add(child)
+        self.mempool.remove(tx.txid)
+        self.assertEqual(len(self.mempool), 0)
+        self.assertEqual(self.mempool.size, 0)
+
+    def test_fee_override(self):
+        with self.assertRaisesRegex(ValueError, 'Missing'):
+            self.mempool.add(spend(self.blocks[1].txns[1], 0, 1), fee=5)
+        tx = spend(self.funding, 1, 20)
+        self.assertIs(self.mempool.add(tx, fee=5), True)
+        self.assertEqual(self.mempool.entries[tx.txid][1], 5)
+
+    def test_evict_lowest_fee_rate(self):
+        cheap, rich = spend(self.funding, 0, 49), spend(self.funding, 1, 10)
+        self.mempool.max_size = len(cheap) + len(rich) - 1
+        self.mempool.add(cheap)
+        self.mempool.add(rich)
+        self.assertNotIn(cheap.txid, self.mempool)
+        self.assertIn(rich.txid, self.mempool)
+        with self.assertRaises(ValueError):
+            self.mempool.add(spend(self.funding, 0, 50))
+
+    def test_remove_block_and_expire(self):
+        self.mempool.add(spend(self.funding, 0, 40))
+        tx = spend(self.funding, 1, 10)
+        self.mempool.add(tx)
+        self.mempool.remove_block(BLOCK(BlockHeader(**json_block_header()), [spend(self.funding, 0, 45, b'\x08')]))
+        self.assertEqual(list(self.mempool.txns), [tx.txid])
+        self.assertEqual(self.mempool.expire(before=0), 0)
+        self.assertEqual(self.mempool.expire(before=float('inf')), 1)
+
+    def test_inv(self):
+        txs = [spend(self.funding, 0, 40), spend(self.funding, 1, 10)]
+        for tx in txs:
+            self.mempool.add(tx)
+        invs = self.mempool.inv(START_STRING, max_count=1)
+        self.assertEqual(len(invs), 2)
+        for inv, tx in zip(invs, txs):
+            decoded = MSG.toMSG(inv.serialize())
+            self.assertIsInstance(decoded, Inv)
+            self.assertEqual(decoded.payload.inventory[0].hash, tx.txid)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,7 +8,7 @@
 import sys
 sys.path.append('.')
 import unittest
-from src.BlockChain.block import MerkleBlock
+from src.BlockChain.block import MerkleBlock, MerkleTree, PartialMerkleTree
 from src.Transaction.transaction import TRANSACTION
 from tests.data.local import json_merkle_block, json_transaction
 
@@ -20,13 +20,10 @@ class Test_MERKLEBLOCK(unittest.TestCase):
 
     def test_merkle_block_initialization(self):
         self.assertEqual(
-            len(self.merkle_block.txns), self.merkle_block.merkle_tree[0][0]
+            len(self.merkle_block.txns), len(self.merkle_block.merkle_tree.levels[0])
         )
         self.assertEqual(
-            self.merkle_block.root(), self.merkle_block.merkle_tree[-1][1]
-        )
-        self.assertEqual(
-            self.merkle_block.root(), self.merkle_block.merkle_tree[-1][2]
+            self.merkle_block.root(), MerkleTree.root_of(self.merkle_block.merkle_tree.levels[0]).hex()
         )
         self.assertEqual(
             self.merkle_block.root(), self.merkle_block.block_header.merkle_root_hash
@@ -34,7 +31,7 @@ class Test_MERKLEBLOCK(unittest.TestCase):
 
     def test_merkle_block_update(self):
         tx = TRANSACTION(
-            **json_transaction()
+            **{**json_transaction(), 'lock_time': len(self.merkle_block.txns)}
         )
         _len, _root = len(self.merkle_block), self.merkle_block.root()
 
@@ -47,11 +44,29 @@ class Test_MERKLEBLOCK(unittest.TestCase):
             _root == self.merkle_block.root(), False
         )
         self.assertEqual(
-            self.merkle_block.root(), self.merkle_block.merkle_tree[-1][2]
+            self.merkle_block.root(), MerkleTree.root_of(self.merkle_block.merkle_tree.levels[0]).hex()
         )
         self.assertEqual(
             self.merkle_block.root(), self.merkle_block.block_header.merkle_root_hash
         )
 
+    def test_partial_merkle_tree(self):
+        for lock_time in range(len(self.merkle_block.txns), len(self.merkle_block.txns) + 11):
+            self.merkle_block.update(TRANSACTION(**{**json_transaction(), 'lock_time': lock_time}))
+        txids = self.merkle_block.merkle_tree.levels[0]
+        root = bytes.fromhex(self.merkle_block.root())
+        for matches in ([txids[0]], [txids[3], txids[7]], txids[-1:], txids):
+            partial = self.merkle_block.partial(set(matches))
+            self.assertEqual(partial.extract(), (root, matches))
+            self.assertLessEqual(len(partial.hashes), len(txids))
+
+    def test_partial_merkle_tree_rejects_malformed(self):
+        txids = self.merkle_block.merkle_tree.levels[0]
+        partial = self.merkle_block.partial({txids[0]})
+        with self.assertRaises(ValueError):
+            PartialMerkleTree(partial.transaction_count, partial.hashes[:-1], partial.flags).extract()
+        with self.assertRaises(ValueError):
+            PartialMerkleTree(partial.transaction_count, partial.hashes + [txids[0]], partial.flags).extract()
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
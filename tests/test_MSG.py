@@ -0,0 +1,149 @@
+'''
+@File     : test_MSG.py
+@Time     : 2025/01/04 10:12:40
+@Author   : H.SEON
+@Contact  : dsj34473@163.com
+'''
+
+import sys
+sys.path.append('.')
+import asyncio
+import logging
+import unittest
+import tempfile
+from types import SimpleNamespace
+from hashlib import sha256
+from src.BlockChain.blockChain import BlockChain
+from src.BlockChain.utxo import UTXOSet
+from src.BlockChain.validation import BlockValidator
+from src.Transaction.mempool import MemoryPool
+from src.PeerToPeerNetwork.Msg import *
+from src.PeerToPeerNetwork.NetConf.LocalNet import START_STRING
+from tests.data.local import *
+from src.BlockChain.block import MerkleBlock as MERKLE_BLOCK
+from src.PeerToPeerNetwork.Msg import MerkleBlock
+
+class TestMSG(unittest.TestCase):
+
+    def setUp(self):
+        self.messages = [
+            Block(start_string=START_STRING, block=BLOCK(**json_block())),
+            Tx(start_string=START_STRING, transaction=TRANSACTION(**json_transaction())),
+            Inv(
+                start_string=START_STRING,
+                inventory=[INVENTORY(type_identifier=MSG_TX, hash=sha256(b'').digest())]
+            ),
+            GetHeaders(
+                start_string=START_STRING,
+                version=1,
+                block_header_hashes=[sha256(b'').digest()],
+                stop_hash=sha256(b'1').digest()
+            ),
+            Mempool(start_string=START_STRING),
+            Ping(start_string=START_STRING, nonce=7),
+        ]
+
+    def test_toMSG_dispatch(self):
+        for message in self.messages:
+            decoded = MSG.toMSG(message.serialize())
+            self.assertIsInstance(decoded, type(message))
+            self.assertEqual(decoded.serialize(), message.serialize())
+
+    def test_toMSG_trailing_data(self):
+        data = b''.join([message.serialize() for message in self.messages])
+        for message in self.messages:
+            decoded, offset = MSG.unpack_from(data)
+            self.assertIsInstance(decoded, type(message))
+            data = data[offset:]
+        self.assertEqual(data, b'')
+
+    def test_toMSG_unknown_command(self):
+        data = bytearray(self.messages[-1].serialize())
+        data[len(START_STRING_SERIALIZE):len(START_STRING_SERIALIZE) + COMMAND_NAME_LENGTH] = COMMAND_NAME_SERIALIZE.serialize(b'unknown')
+        with self.assertRaises(ValueError):
+            MSG.toMSG(data)
+
+    def test_toMSG_bad_checksum(self):
+        data = bytearray(self.messages[1].serialize())
+        data[-1] ^= 0xff
+        with self.assertRaises(ValueError):
+            MSG.toMSG(data)
+
+    def test_toMSG_checksum_before_decode(self):
+        data = bytearray(self.messages[0].serialize())
+        data[len(MESSAGE_HEADER_SERIALIZE):] = b'\xff' * (len(data) - len(MESSAGE_HEADER_SERIALIZE))
+        with self.assertRaisesRegex(ValueError, 'Checksum'):
+            MSG.toMSG(data)
+
+    def test_buffers_and_serialize_into(self):
+        for message in self.messages:
+            data = message.serialize()
+            self.assertEqual(b''.join(message.buffers()), data)
+            buffer = bytearray(b'prefix')
+            self.assertEqual(message.serialize_into(buffer), len(data))
+            self.assertEqual(bytes(buffer), b'prefix' + data)
+
+    def test_buffers_reuse_raw_payload(self):
+        data = self.messages[0].serialize()
+        decoded = MSG.toMSG(data)
+        header, payload = decoded.buffers()
+        self.assertIsInstance(payload, memoryview)
+        self.assertIs(payload.obj, decoded.payload.raw().obj)
+        self.assertEqual(Block_(decoded.payload.block).raw(), decoded.payload.raw())
+        self.assertEqual(header + payload, data)
+
+    def test_block_framing_merkle_block(self):
+        block = MERKLE_BLOCK(**json_merkle_block())
+        for lock_time in range(len(block.txns), len(block.txns) + 2):
+            block.update(TRANSACTION(**{**json_transaction(), 'lock_time': lock_time}))
+        message = Block(start_string=START_STRING, block=block)
+        data = message.serialize()
+        self.assertEqual(message.message_header.payload_size, len(data) - len(MESSAGE_HEADER_SERIALIZE))
+        self.assertEqual(MSG.toMSG(data).serialize(), data)
+
+    def test_merkle_block_verify(self):
+        block = MERKLE_BLOCK(**json_merkle_block())
+        for lock_time in range(len(block.txns), len(block.txns) + 12):
+            block.update(TRANSACTION(**{**json_transaction(), 'lock_time': lock_time}))
+        txids = [txn.txid for txn in block.txns]
+        for matches in ([], [txids[0]], [txids[2], txids[9]], txids[-1:]):
+            payload = MerkleBlock_.from_block(block, set(matches))
+            message = MerkleBlock(
+                start_string=START_STRING,
+                block_header=payload.block_header,
+                transaction_count=payload.transaction_count,
+                hashes=payload.hashes,
+                flags=payload.flags
+            )
+            self.assertEqual(MSG.toMSG(message.serialize()).payload.verify(), matches)
+        payload.hashes[0] = sha256(b'').digest()
+        with self.assertRaises(ValueError):
+            payload.verify()
+
+class TestBlockAct(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.TemporaryDirectory()
+        utxo = UTXOSet(self.path.name)
+        self.client = SimpleNamespace(
+            blockchain=BlockChain(self.path.name),
+            utxo=utxo,
+            mempool=MemoryPool(utxo),
+            validator=BlockValidator(utxo),
+            logger=logging.getLogger('test')
+        )
+
+    def tearDown(self):
+        self.client.utxo.close()
+        self.client.blockchain.close()
+        self.path.cleanup()
+
+    def test_reject_invalid_block(self):
+        block = BLOCK(BlockHeader(**json_block_header()), [AuditMission(**json_ATM())])
+        with self.assertLogs('test', 'WARNING') as logs:
+            asyncio.run(Block_(block).act(self.client))
+        self.assertIn('Merkle', logs.output[0])
+        self.assertEqual(len(self.client.blockchain), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,186 @@
+'''
+@File     : test_P2PNETWORK.py
+@Time     : 2025/01/13 10:22:48
+@Author   : H.SEON
+@Contact  : dsj34473@163.com
+'''
+
+import sys
+sys.path.append('.')
+import asyncio
+import unittest
+from src.PeerToPeerNetwork.P2PNetwork import RecvPeer, TransPeer, ConnectionPool, MessageQueue
+from src.PeerToPeerNetwork.Msg import *
+from src.PeerToPeerNetwork.NetConf.LocalNet import START_STRING
+
+class PeerTestCase(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.sequence = asyncio.Queue()
+        self.recv_peer = RecvPeer(name='test:recv', IP_address='127.0.0.1', port=0, listen=128, mesSequence=self.sequence)
+        self.address = self.recv_peer.skt.getsockname()
+        self.server = asyncio.create_task(self.recv_peer.recv())
+        await asyncio.sleep(0)
+
+    async def asyncTearDown(self):
+        self.server.cancel()
+        await asyncio.gather(self.server, return_exceptions=True)
+
+    async def send(self, *chunks: bytes) -> None:
+        reader, writer = await asyncio.open_connection(*self.address)
+        for chunk in chunks:
+            writer.write(chunk)
+            await writer.drain()
+            await asyncio.sleep(0)
+        writer.close()
+        await writer.wait_closed()
+
+class TestRecvPeer(PeerTestCase):
+
+    async def test_concurrent_connections(self):
+        messages = [Ping(start_string=START_STRING, nonce=i).serialize() for i in range(200)]
+        await asyncio.gather(*[self.send(data) for data in messages])
+        received = [await asyncio.wait_for(self.sequence.get(), 5) for _ in messages]
+        self.assertEqual(sorted(bytes(data) for data, _ in received), sorted(messages))
+
+    async def test_framed_messages(self):
+        messages = [Ping(start_string=START_STRING, nonce=i).serialize() for i in range(3)]
+        stream = b''.join(messages)
+        await self.send(stream[:5], stream[5:30], stream[30:])
+        for message in messages:
+            data, _ = await asyncio.wait_for(self.sequence.get(), 5)
+            self.assertIsInstance(data, bytes)
+            self.assertEqual(data, message)
+            self.assertEqual(MSG.toMSG(data).payload.nonce, MSG.toMSG(message).payload.nonce)
+
+    async def test_oversized_payload(self):
+        data = bytearray(Ping(start_string=START_STRING, nonce=1).serialize())
+        data[16:20] = (0xFFFFFFFF).to_bytes(4, 'little')
+        await self.send(bytes(data), Ping(start_string=START_STRING, nonce=2).serialize())
+        await asyncio.sleep(0.05)
+        self.assertTrue(self.sequence.empty())
+
+class TestConnectionPool(PeerTestCase):
+
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        self.pool = ConnectionPool()
+
+    async def asyncTearDown(self):
+        self.pool.close()
+        await super().asyncTearDown()
+
+    async def test_reuse_connection(self):
+        messages = [Ping(start_string=START_STRING, nonce=i).serialize() for i in range(5)]
+        for message in messages:
+            await self.pool.send(self.address, message)
+        for message in messages:
+            data, _ = await asyncio.wait_for(self.sequence.get(), 5)
+            self.assertEqual(data, message)
+        self.assertEqual(len(self.pool), 1)
+        self.assertEqual(len(self.recv_peer.connections), 1)
+
+    async def test_send_buffers(self):
+        message = Tx(start_string=START_STRING, transaction=TRANSACTION(tx_in=[], tx_out=[], lock_time=1))
+        size = await self.pool.send(self.address, message)
+        data, _ = await asyncio.wait_for(self.sequence.get(), 5)
+        self.assertEqual(data, message.serialize())
+        self.assertEqual(size, len(data))
+
+    async def test_reconnect_after_peer_close(self):
+        # 超长负载使接收端关闭连接，之后的消息应通过新连接送达
+        data = bytearray(Ping(start_string=START_STRING, nonce=0).serialize())
+        data[16:20] = (0xFFFFFFFF).to_bytes(4, 'little')
+        await self.pool.send(self.address, bytes(data))
+        await asyncio.sleep(0.05)
+        messages = [Ping(start_string=START_STRING, nonce=i).serialize() for i in range(1, 4)]
+        for message in messages:
+            await self.pool.send(self.address, message)
+        for message in messages:
+            received, _ = await asyncio.wait_for(self.sequence.get(), 5)
+            self.assertEqual(received, message)
+        self.assertEqual(len(self.pool), 1)
+
+    async def test_connection_cap_and_idle_timeout(self):
+        other = RecvPeer(name='test:other', IP_address='127.0.0.1', port=0, listen=8, mesSequence=self.sequence)
+        server = asyncio.create_task(other.recv())
+        await asyncio.sleep(0)
+        self.pool.max_connections = 1
+        message = Ping(start_string=START_STRING, nonce=1).serialize()
+        await self.pool.send(self.address, message)
+        await self.pool.send(other.skt.getsockname(), message)
+        self.assertEqual(list(self.pool.connections), [other.skt.getsockname()])
+        self.pool.idle_timeout = 0
+        self.pool.reap()
+        self.assertEqual(len(self.pool), 0)
+        server.cancel()
+        await asyncio.gather(server, return_exceptions=True)
+
+    async def test_reconnect_backoff(self):
+        self.server.cancel()
+        await asyncio.gather(self.server, return_exceptions=True)
+        self.recv_peer.skt.close()
+        message = Ping(start_string=START_STRING, nonce=1).serialize()
+        with self.assertRaisesRegex(ConnectionError, 'Failed'):
+            await self.pool.send(self.address, message)
+        with self.assertRaisesRegex(ConnectionError, 'backed off'):
+            await self.pool.send(self.address, message)
+        self.assertEqual(self.pool.failures[self.address][0], 1)
+
+class TestTransPeer(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.sequence = asyncio.Queue()
+        self.trans_peer = TransPeer(name='test:trans', IP_address='127.0.0.1', port=0, listen=8, mesSequence=self.sequence, actSequence=asyncio.Queue())
+
+    async def asyncTearDown(self):
+        self.trans_peer.skt.close()
+
+    async def test_rejected_per_ip(self):
+        data = bytearray(Ping(start_string=START_STRING, nonce=1).serialize())
+        data[-1] ^= 0xff
+        for port in range(40000, 40003):
+            await self.sequence.put((bytes(data), ('127.0.0.1', port)))
+        task = asyncio.create_task(self.trans_peer.responce())
+        await asyncio.wait_for(self.sequence.join(), 5)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        self.assertEqual(dict(self.trans_peer.rejected), {'127.0.0.1': 3})
+
+    async def test_rejected_cap(self):
+        for i in range(MAX_REJECTED_PEERS + 10):
+            self.trans_peer.reject((f'10.0.{i // 256}.{i % 256}', 8333))
+        self.assertEqual(len(self.trans_peer.rejected), MAX_REJECTED_PEERS)
+        self.assertNotIn('10.0.0.0', self.trans_peer.rejected)
+        self.assertEqual(self.trans_peer.reject(('10.0.0.5', 1)), 1)
+        self.assertEqual(self.trans_peer.reject(('10.0.0.5', 2)), 2)
+
+class TestMessageQueue(unittest.IsolatedAsyncioTestCase):
+
+    async def test_priority_and_fifo(self):
+        queue = MessageQueue()
+        messages = [
+            Tx(start_string=START_STRING, transaction=TRANSACTION(tx_in=[], tx_out=[], lock_time=1)).serialize(),
+            Inv(start_string=START_STRING, inventory=[]).serialize(),
+            Ping(start_string=START_STRING, nonce=1).serialize(),
+            Ping(start_string=START_STRING, nonce=2).serialize(),
+            GetHeaders(start_string=START_STRING, version=1, block_header_hashes=[], stop_hash=b'\x00' * 32).serialize(),
+        ]
+        for i, message in enumerate(messages):
+            await queue.put((message, i))
+        self.assertEqual(queue.metrics()['depths'], {PRIORITY_BODY: 1, PRIORITY_INV: 1, PRIORITY_CONTROL: 2, PRIORITY_HEADERS: 1})
+        self.assertEqual([(await queue.get())[1] for _ in messages], [2, 3, 4, 1, 0])
+        self.assertEqual(queue.metrics()['max_depth'], len(messages))
+
+    async def test_backpressure(self):
+        queue = MessageQueue(maxsize=1)
+        await queue.put(b'')
+        put = asyncio.create_task(queue.put(b''))
+        await asyncio.sleep(0)
+        self.assertFalse(put.done())
+        await queue.get()
+        await asyncio.wait_for(put, 1)
+        self.assertEqual(queue.qsize(), 1)
+
+if __name__ == '__main__':
+    unittest.main()
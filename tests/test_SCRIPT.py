@@ -0,0 +1,48 @@
+'''
+@File     : test_SCRIPT.py
+@Time     : 2025/01/12 11:31:06
+@Author   : H.SEON
+@Contact  : dsj34473@163.com
+'''
+
+import sys
+sys.path.append('.')
+import unittest
+from src.BlockChain.validation import BlockValidator
+from src.Transaction.mempool import MemoryPool
+from src.Transaction.script import ScriptCache
+from tests.data.local import *
+
+class TestScriptCache(UTXOTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.calls = []
+
+    def verifier(self, tx: TRANSACTION, index: int, txout: TxOut) -> bool:
+        self.calls.append((tx.txid, index))
+        return tx.tx_in[index].signature_script != b'\xff'
+
+    def test_mempool_then_block(self):
+        scripts = ScriptCache(self.verifier)
+        tx = spend(self.funding, 0, 49)
+        MemoryPool(utxo=self.utxo, scripts=scripts).add(tx)
+        block = merkle_block([AuditMission(**json_ATM()), tx, spend(self.funding, 1, 20)])
+        with BlockValidator(self.utxo, workers=1, scripts=scripts) as validator:
+            validator.validate(block)
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual((scripts.hits, scripts.misses), (1, 2))
+
+    def test_reject_and_bound(self):
+        scripts = ScriptCache(self.verifier, max_size=1)
+        mempool = MemoryPool(utxo=self.utxo, scripts=scripts)
+        with self.assertRaises(ValueError):
+            mempool.add(spend(self.funding, 0, 49, b'\xff'))
+        self.assertEqual(len(mempool), 0)
+        self.assertEqual(len(scripts), 0)
+        mempool.add(spend(self.funding, 0, 49))
+        mempool.add(spend(self.funding, 1, 20))
+        self.assertEqual(len(scripts), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -32,5 +32,24 @@ class TestTransaction(unittest.TestCase):
         self.assertIsInstance(deserialized_transaction, TRANSACTION)
         self.assertEqual(deserialized_transaction.serialize(), self.transaction.serialize())
 
+    def test_transaction_immutable(self):
+        with self.assertRaises(AttributeError):
+            self.transaction.lock_time = 0
+        with self.assertRaises(AttributeError):
+            self.transaction.tx_in[0].signature_script = b''
+        self.assertIsInstance(self.transaction.tx_in, tuple)
+
+    def test_transaction_serialization_cached(self):
+        self.assertIs(self.transaction.serialize(), self.transaction.serialize())
+        self.assertEqual(self.transaction.txid, hashlib.sha256(self.transaction.serialize()).digest())
+        self.assertEqual(self.transaction._hash(), self.transaction.txid.hex())
+
+    def test_transaction_retains_raw(self):
+        serialized_transaction = self.transaction.serialize()
+        deserialized_transaction = TRANSACTION.deserialize(serialized_transaction)
+        self.assertIsInstance(deserialized_transaction.raw(), memoryview)
+        self.assertEqual(deserialized_transaction.txid, self.transaction.txid)
+        self.assertEqual(len(deserialized_transaction), len(serialized_transaction))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,87 @@
+'''
+@File     : test_UTXO.py
+@Time     : 2025/01/08 11:37:52
+@Author   : H.SEON
+@Contact  : dsj34473@163.com
+'''
+
+import sys
+sys.path.append('.')
+import unittest
+import tempfile
+from src.BlockChain.utxo import UTXOSet
+from src.BlockChain.blockChain import BlockChain
+from tests.data.local import *
+
+class TestUTXOSet(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.TemporaryDirectory()
+        self.blocks = spending_chain()
+        self.funding, self.spending = self.blocks[0].txns[1], self.blocks[1].txns[1]
+
+    def tearDown(self):
+        self.path.cleanup()
+
+    def test_connect_block(self):
+        with UTXOSet(self.path.name) as utxo:
+            self.assertEqual(utxo.connect_block(self.blocks[0], 0), [])
+            spent = utxo.connect_block(self.blocks[1], 1)
+            self.assertEqual(spent, [((self.funding.txid, 0), self.funding.tx_out[0])])
+            self.assertNotIn((self.funding.txid, 0), utxo)
+            self.assertIn((self.funding.txid, 1), utxo)
+            self.assertEqual(utxo.get((self.spending.txid, 0)), self.spending.tx_out[0])
+            with self.assertRaises(ValueError):
+                utxo.connect_block(self.blocks[1], 1)
+
+    def test_reject_double_spend(self):
+        with UTXOSet(self.path.name) as utxo:
+            utxo.connect_block(self.blocks[0], 0)
+            double_spend = BLOCK(BlockHeader(**json_block_header()), [self.spending, self.spending])
+            with self.assertRaises(ValueError):
+                utxo.connect_block(double_spend, 1)
+            self.assertIn((self.funding.txid, 0), utxo)
+            self.assertEqual(utxo.height, 0)
+
+    def test_catch_up(self):
+        self.blocks[1].block_header.previous_block_header_hash = self.blocks[0].block_header._hash()
+        with BlockChain(self.path.name) as blockchain, UTXOSet(self.path.name) as utxo:
+            for block in self.blocks:
+                blockchain.add_block(block)
+            utxo.connect_block(self.blocks[0], 0)
+            self.assertEqual(utxo.catch_up(blockchain), 1)
+            self.assertEqual(utxo.height, 1)
+            self.assertIn((self.spending.txid, 0), utxo)
+            self.assertEqual(utxo.catch_up(blockchain), 0)
+
+    def test_reopen_with_small_cache(self):
+        with UTXOSet(self.path.name, cache_size=1) as utxo:
+            for height, block in enumerate(self.blocks):
+                utxo.connect_block(block, height)
+            self.assertLessEqual(len(utxo.cache), 1)
+        with UTXOSet(self.path.name) as utxo:
+            self.assertEqual(utxo.height, 1)
+            self.assertNotIn((self.funding.txid, 0), utxo)
+            self.assertEqual(utxo.get((self.funding.txid, 1)), self.funding.tx_out[1])
+
+    def test_disconnect_block(self):
+        with UTXOSet(self.path.name) as utxo:
+            for height, block in enumerate(self.blocks):
+                utxo.connect_block(block, height)
+            with self.assertRaises(ValueError):
+                utxo.disconnect_block(self.blocks[0])
+            utxo.disconnect_block(self.blocks[1])
+            self.assertEqual(utxo.height, 0)
+            self.assertEqual(len(utxo.journal), 1)
+            self.assertEqual(utxo.get((self.funding.txid, 0)), self.funding.tx_out[0])
+            self.assertNotIn((self.spending.txid, 0), utxo)
+        with UTXOSet(self.path.name) as utxo:
+            self.assertIn((self.funding.txid, 0), utxo)
+            utxo.connect_block(self.blocks[1], 1)
+            utxo.disconnect_block(self.blocks[1])
+            utxo.disconnect_block(self.blocks[0])
+            self.assertEqual(utxo.height, -1)
+            self.assertNotIn((self.funding.txid, 1), utxo)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+'''
+@File     : test_VALIDATION.py
+@Time     : 2025/01/11 11:48:15
+@Author   : H.SEON
+@Contact  : dsj34473@163.com
+'''
+
+import sys
+sys.path.append('.')
+import asyncio
+import unittest
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from src.BlockChain.validation import BlockValidator, check_transactions
+from tests.data.local import *
+
+class TestBlockValidator(UTXOTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.atm = AuditMission(**json_ATM())
+        self.executor = ThreadPoolExecutor(2)
+
+    def tearDown(self):
+        self.executor.shutdown()
+        super().tearDown()
+
+    def test_validate(self):
+        parent = spend(self.funding, 0, 49)
+        block = merkle_block([self.atm, parent, spend(parent, 0, 40), spend(self.funding, 1, 20)])
+        for executor in (None, self.executor):
+            with BlockValidator(self.utxo, chunk_size=1, executor=executor) as validator:
+                self.assertEqual(validator.validate(block), 10)
+        with BlockValidator(self.utxo, workers=2, chunk_size=1) as validator:
+            self.assertEqual(validator.validate(block), 10)
+            self.assertIsInstance(validator.executor, ThreadPoolExecutor)
+        with ProcessPoolExecutor(2) as executor, BlockValidator(self.utxo, chunk_size=1, executor=executor) as validator:
+            self.assertEqual(validator.validate(block), 10)
+
+    def test_validate_async(self):
+        parent = spend(self.funding, 0, 49)
+        block = merkle_block([self.atm, parent, spend(parent, 0, 40)])
+        with BlockValidator(self.utxo) as validator:
+            self.assertEqual(asyncio.run(validator.validate_async(block)), validator.validate(block))
+            block.block_header.merkle_root_hash = '00' * 32
+            with self.assertRaisesRegex(ValueError, 'Merkle'):
+                asyncio.run(validator.validate_async(block))
+
+    def test_reject_invalid_blocks(self):
+        with BlockValidator(self.utxo, workers=1) as validator:
+            block = merkle_block([self.atm, spend(self.funding, 0, 49)])
+            block.block_header.merkle_root_hash = '00' * 32
+            with self.assertRaisesRegex(ValueError, 'Merkle'):
+                validator.validate(block)
+            with self.assertRaisesRegex(ValueError, 'ATM'):
+                validator.validate(merkle_block([spend(self.funding, 0, 49)]))
+            with self.assertRaisesRegex(ValueError, 'twice'):
+                validator.validate(merkle_block([self.atm, spend(self.funding, 0, 49), spend(self.funding, 0, 48)]))
+            with self.assertRaisesRegex(ValueError, 'exceed'):
+                validator.validate(merkle_block([self.atm, spend(self.funding, 1, 21)]))
+            with self.assertRaisesRegex(ValueError, 'no inputs'):
+                validator.validate(merkle_block([self.atm, TRANSACTION(tx_in=[], tx_out=[TxOut(MAX_MONEY, b'\x01')], lock_time=0)]))
+            with self.assertRaisesRegex(ValueError, 'range'):
+                validator.validate(merkle_block([self.atm, spend(self.funding, 1, MAX_MONEY + 1)]))
+
+    def test_check_transactions(self):
+        txns = [spend(self.funding, 0, 49), spend(self.funding, 1, MAX_MONEY + 1)]
+        errors = check_transactions(b''.join(txn.serialize() for txn in txns), len(txns))
+        self.assertEqual(errors[0], None)
+        self.assertEqual(errors[1], 'Output value out of range')
+
+if __name__ == '__main__':
+    unittest.main()